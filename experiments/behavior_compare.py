@@ -8,20 +8,23 @@ Usage:
     uv run python experiments/behavior_compare.py
     uv run python experiments/behavior_compare.py --tests 1,3 --models opus
     uv run python experiments/behavior_compare.py --dry-run
+    uv run python experiments/behavior_compare.py --resume
 """
 
 from __future__ import annotations
 
 import argparse
+import asyncio
+import contextlib
 import json
 import os
-import shutil
-import subprocess
 import sys
 import tempfile
 import time
-from dataclasses import dataclass
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass
 from datetime import datetime
+from functools import cached_property, lru_cache
 from pathlib import Path
 from typing import Callable
 
@@ -29,14 +32,17 @@ from typing import Callable
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
 
 from cord.db import CordDB
-from cord.runtime.dispatcher import generate_mcp_config, MCP_TOOLS
+from cord.runtime.dispatcher import generate_mcp_config, MCP_TOOLS_JOINED
 
 PROJECT_DIR = Path(__file__).resolve().parent.parent
 RESULTS_FILE = Path(__file__).resolve().parent / "RESULTS.md"
+RESULTS_LOG = RESULTS_FILE.with_suffix(".jsonl")
+_PROJECT_DIR_STR = str(PROJECT_DIR)
 
 DEFAULT_MODELS = ["opus", "sonnet"]
 DEFAULT_BUDGET = 1.0  # USD per test per model
 DEFAULT_TIMEOUT = 180  # seconds per test
+CAPTURE_EDGE = 4096  # bytes of CLI output kept from each end
 
 
 # ─── Data Classes ────────────────────────────────────────────────────────
@@ -51,40 +57,48 @@ class TestResult:
     stderr: str
     returncode: int
     elapsed: float
-    nodes_before: list[dict]
+    nodes_before: list[dict]  # node_id/status/result only; used for diffs
     nodes_after: list[dict]
     error: str | None = None
 
+    @cached_property
+    def _diff(self) -> tuple[list[dict], list[str], str | None]:
+        """(new_nodes, status_changes, agent_result) from one pass over nodes_after."""
+        before = {n["node_id"]: n for n in self.nodes_before}
+        new_nodes: list[dict] = []
+        changes: list[str] = []
+        agent_result: str | None = None
+        for n in self.nodes_after:
+            old = before.get(n["node_id"])
+            if old is None:
+                new_nodes.append(n)
+            elif old["status"] and old["status"] != n["status"]:
+                changes.append(f"`{n['node_id']}`: {old['status']} → {n['status']}")
+            if (
+                agent_result is None
+                and n["status"] == "complete"
+                and n.get("result")
+                and (old or {}).get("result") != n["result"]
+            ):
+                agent_result = n["result"]
+        return new_nodes, changes, agent_result
+
     @property
     def nodes_created(self) -> int:
-        before_ids = {n["node_id"] for n in self.nodes_before}
-        return len([n for n in self.nodes_after if n["node_id"] not in before_ids])
+        return len(self.new_nodes)
 
     @property
     def new_nodes(self) -> list[dict]:
-        before_ids = {n["node_id"] for n in self.nodes_before}
-        return [n for n in self.nodes_after if n["node_id"] not in before_ids]
+        return self._diff[0]
 
     @property
     def status_changes(self) -> list[str]:
-        before_map = {n["node_id"]: n["status"] for n in self.nodes_before}
-        changes = []
-        for n in self.nodes_after:
-            old = before_map.get(n["node_id"])
-            if old and old != n["status"]:
-                changes.append(f"`{n['node_id']}`: {old} → {n['status']}")
-        return changes
+        return self._diff[1]
 
     @property
     def agent_result(self) -> str | None:
         """Get the result from the agent's complete() call, if any."""
-        before_map = {n["node_id"]: n.get("result") for n in self.nodes_before}
-        for n in self.nodes_after:
-            nid = n["node_id"]
-            if n["status"] == "complete" and n.get("result"):
-                if before_map.get(nid) != n["result"]:
-                    return n["result"]
-        return None
+        return self._diff[2]
 
 
 @dataclass
@@ -258,99 +272,185 @@ def snapshot_nodes(db: CordDB) -> list[dict]:
     return db.all_nodes()
 
 
+@lru_cache(maxsize=1)
 def _clean_env() -> dict[str, str]:
-    """Return env dict without CLAUDECODE to allow nested sessions."""
+    """Return env dict without CLAUDECODE to allow nested sessions.
+
+    Built once and shared by every run; subprocess launches never mutate it.
+    """
     env = os.environ.copy()
     env.pop("CLAUDECODE", None)
     return env
 
 
+def _json_bytes(obj: object, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes for the binary-mode config and log writes."""
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
+
+def _decode_output(data: bytes) -> str:
+    """Decode the head and tail of CLI output; the middle never reaches the report.
+
+    Slicing before decoding skips a full-buffer UTF-8 pass on large
+    transcripts; a character split at a cut is replaced, not raised.
+    """
+    if len(data) <= 2 * CAPTURE_EDGE:
+        return data.decode(errors="replace")
+    head = data[:CAPTURE_EDGE].decode(errors="replace")
+    tail = data[-CAPTURE_EDGE:].decode(errors="replace")
+    dropped = len(data) - 2 * CAPTURE_EDGE
+    return f"{head}\n...[truncated {dropped} bytes]...\n{tail}"
+
+
 def build_cmd(prompt: str, model: str, config_path: Path, budget: float) -> list[str]:
     """Build the claude CLI command."""
     return [
         "claude", "-p", prompt,
         "--model", model,
         "--mcp-config", str(config_path),
-        "--allowedTools", " ".join(MCP_TOOLS),
+        "--allowedTools", MCP_TOOLS_JOINED,
         "--dangerously-skip-permissions",
         "--max-budget-usd", str(budget),
     ]
 
 
-def run_single(
+@dataclass
+class ScenarioTemplate:
+    db_bytes: bytes
+    agent_id: str
+    prompt: str
+    nodes_before: list[dict]
+
+
+def build_template(scenario: TestScenario) -> ScenarioTemplate:
+    """Run a scenario's setup into a scratch DB and capture it as a template."""
+    with tempfile.TemporaryDirectory(prefix=f"cord-exp-template-{scenario.id}-") as tmp:
+        db_path = Path(tmp) / "cord.db"
+        db = CordDB(db_path)
+        try:
+            agent_id, prompt = scenario.setup(db)
+            nodes_before = db.snapshot_ids_and_status()
+        finally:
+            # Closing the only connection checkpoints the WAL into the
+            # main file, so its bytes carry the full state.
+            db.close()
+        return ScenarioTemplate(db_path.read_bytes(), agent_id, prompt, nodes_before)
+
+
+def build_templates(scenarios: list[TestScenario]) -> dict[str, Future[ScenarioTemplate]]:
+    """Build every scenario's template DB in parallel worker processes.
+
+    Scenario setups are deterministic, so each is built once and written
+    into every per-model run directory. A failed setup surfaces when its
+    future's result() is taken inside run_single.
+    """
+    workers = min(len(scenarios), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return {s.id: ex.submit(build_template, s) for s in scenarios}
+
+
+async def run_single(
     scenario: TestScenario,
     model: str,
+    template: Future[ScenarioTemplate],
+    session_tmp: Path,
     budget: float = DEFAULT_BUDGET,
     timeout: int = DEFAULT_TIMEOUT,
     dry_run: bool = False,
 ) -> TestResult:
     """Run one scenario with one model."""
-    tmp_dir = Path(tempfile.mkdtemp(prefix=f"cord-exp-{scenario.id}-{model}-"))
+    tmp_dir = session_tmp / f"{scenario.id}-{model}"
     db_path = tmp_dir / "cord.db"
+    label = f"[Test {scenario.id}] {model}"
 
     try:
-        # Setup DB state
+        tmp_dir.mkdir()
+        # Setup DB state from the scenario template
+        tpl = template.result()
+        db_path.write_bytes(tpl.db_bytes)
         db = CordDB(db_path)
-        agent_id, prompt = scenario.setup(db)
-        nodes_before = snapshot_nodes(db)
+        agent_id, prompt = tpl.agent_id, tpl.prompt
+        nodes_before = tpl.nodes_before
 
         # Generate MCP config
         config = generate_mcp_config(db_path, agent_id, PROJECT_DIR)
         config_path = tmp_dir / "mcp.json"
-        config_path.write_text(json.dumps(config, indent=2))
+        config_path.write_bytes(_json_bytes(config, indent=True))
 
         cmd = build_cmd(prompt, model, config_path, budget)
 
         if dry_run:
-            print(f"  {model}: DRY RUN")
-            print(f"    Agent: {agent_id}")
-            print(f"    Nodes: {len(nodes_before)}")
-            print(f"    Cmd: {' '.join(cmd[:6])}...")
+            print(
+                f"  {label}: DRY RUN\n"
+                f"    Agent: {agent_id}\n"
+                f"    Nodes: {len(nodes_before)}\n"
+                f"    Cmd: {' '.join(cmd[:6])}..."
+            )
             return TestResult(
                 test_id=scenario.id, test_name=scenario.name, model=model,
                 stdout="(dry run)", stderr="", returncode=0, elapsed=0,
                 nodes_before=nodes_before, nodes_after=nodes_before,
             )
 
-        print(f"  {model}...", end=" ", flush=True)
+        print(f"  {label}: running...")
         start = time.time()
-        result = subprocess.run(
-            cmd, capture_output=True, text=True,
-            timeout=timeout, cwd=str(PROJECT_DIR),
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=_PROJECT_DIR_STR,
             env=_clean_env(),
         )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise
         elapsed = time.time() - start
 
-        # Snapshot DB after run
-        db_after = CordDB(db_path)
-        nodes_after = snapshot_nodes(db_after)
+        # Snapshot DB after run on the setup handle; WAL readers see the
+        # writes the agent's MCP server committed from its own process.
+        nodes_after = snapshot_nodes(db)
 
         tr = TestResult(
             test_id=scenario.id, test_name=scenario.name, model=model,
-            stdout=result.stdout, stderr=result.stderr,
-            returncode=result.returncode, elapsed=elapsed,
+            stdout=_decode_output(stdout),
+            stderr=_decode_output(stderr),
+            returncode=proc.returncode, elapsed=elapsed,
             nodes_before=nodes_before, nodes_after=nodes_after,
         )
-        print(f"done ({elapsed:.1f}s, +{tr.nodes_created} nodes)")
         return tr
 
-    except subprocess.TimeoutExpired:
-        print(f"TIMEOUT ({timeout}s)")
+    except asyncio.TimeoutError:
         return TestResult(
             test_id=scenario.id, test_name=scenario.name, model=model,
             stdout="", stderr="", returncode=-1, elapsed=float(timeout),
             nodes_before=[], nodes_after=[], error="Timeout",
         )
     except Exception as e:
-        print(f"ERROR: {e}")
         return TestResult(
             test_id=scenario.id, test_name=scenario.name, model=model,
             stdout="", stderr="", returncode=-1, elapsed=0,
             nodes_before=[], nodes_after=[], error=str(e),
         )
-    finally:
-        if not dry_run:
-            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def load_results(path: Path) -> list[TestResult]:
+    """Read streamed run records back from a JSONL results log.
+
+    A line cut short by a crash mid-write is skipped.
+    """
+    if not path.exists():
+        return []
+    results = []
+    with path.open() as f:
+        for line in f:
+            try:
+                results.append(TestResult(**json.loads(line)))
+            except (json.JSONDecodeError, TypeError):
+                continue
+    return results
 
 
 # ─── Report Generator ───────────────────────────────────────────────────
@@ -372,11 +472,22 @@ def _node_line(node: dict) -> str:
     return " — ".join(parts)
 
 
+# Every document json.loads accepts starts (after whitespace) with one of
+# these, including the NaN/Infinity extensions.
+_JSON_START = frozenset('{["-0123456789tfnNI')
+
+
 def _is_valid_json(text: str) -> bool:
+    if not isinstance(text, str):
+        return False
+    s = text.lstrip()
+    # Prose replies are rejected without building a parse tree.
+    if not s or s[0] not in _JSON_START:
+        return False
     try:
-        json.loads(text)
+        json.loads(s)
         return True
-    except (json.JSONDecodeError, TypeError):
+    except json.JSONDecodeError:
         return False
 
 
@@ -397,25 +508,25 @@ def generate_report(results: list[TestResult], models: list[str]) -> str:
     ]
 
     # Build header
-    header = "| # | Test |"
-    separator = "|---|------|"
+    header = ["| # | Test |"]
+    separator = ["|---|------|"]
     for m in models:
-        header += f" {m.title()} |"
-        separator += "--------|"
-    lines.extend([header, separator])
+        header.append(f" {m.title()} |")
+        separator.append("--------|")
+    lines.extend(["".join(header), "".join(separator)])
 
     for s in SCENARIOS:
         data = by_test.get(s.id, {})
-        row = f"| {s.id} | {s.name} |"
+        row = [f"| {s.id} | {s.name} |"]
         for m in models:
             r = data.get(m)
             if not r:
-                row += " SKIP |"
+                row.append(" SKIP |")
             elif r.error:
-                row += f" ERR: {r.error} |"
+                row.append(f" ERR: {r.error} |")
             else:
-                row += f" {r.elapsed:.1f}s, +{r.nodes_created} nodes |"
-        lines.append(row)
+                row.append(f" {r.elapsed:.1f}s, +{r.nodes_created} nodes |")
+        lines.append("".join(row))
 
     lines.extend(["", "---", ""])
 
@@ -510,6 +621,54 @@ def generate_report(results: list[TestResult], models: list[str]) -> str:
 # ─── Main ────────────────────────────────────────────────────────────────
 
 
+async def _run_all(
+    tasks: list[tuple[TestScenario, str]],
+    args: argparse.Namespace,
+    concurrency: int,
+) -> None:
+    """Run every (scenario, model) pair on one event loop.
+
+    Each run owns its tempdir, DB, and claude subprocess, so runs are
+    independent; the semaphore caps how many CLIs are in flight at once.
+    Live results are appended to RESULTS_LOG as each run finishes, so a
+    crash or Ctrl-C keeps everything completed so far.
+    """
+    sem = asyncio.Semaphore(concurrency)
+
+    templates = build_templates(list({s.id: s for s, _ in tasks}.values())) if tasks else {}
+
+    # One session tmpdir holds every run's directory and is removed once
+    # at the end, instead of a mkdtemp + rmtree per run.
+    with (
+        tempfile.TemporaryDirectory(prefix="cord-exp-") as session_tmp,
+        # A dry run records nothing, so it doesn't create the log.
+        contextlib.nullcontext() if args.dry_run else RESULTS_LOG.open("ab") as log,
+    ):
+
+        async def bounded(scenario: TestScenario, model: str) -> TestResult:
+            async with sem:
+                return await run_single(
+                    scenario, model, templates[scenario.id], Path(session_tmp),
+                    budget=args.budget, timeout=args.timeout,
+                    dry_run=args.dry_run,
+                )
+
+        # Report and persist runs in the order they finish.
+        for next_done in asyncio.as_completed([bounded(s, m) for s, m in tasks]):
+            tr = await next_done
+            label = f"[Test {tr.test_id}] {tr.model}"
+            if tr.error == "Timeout":
+                print(f"  {label}: TIMEOUT ({args.timeout}s)")
+            elif tr.error:
+                print(f"  {label}: ERROR: {tr.error}")
+            if args.dry_run:
+                continue
+            if not tr.error:
+                print(f"  {label}: done ({tr.elapsed:.1f}s, +{tr.nodes_created} nodes)")
+            log.write(_json_bytes(asdict(tr)) + b"\n")
+            log.flush()
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Compare Opus vs Sonnet behavior on Cord MCP tools"
@@ -534,6 +693,14 @@ def main():
         "--dry-run", action="store_true",
         help="Set up DB and show commands without running claude CLI",
     )
+    parser.add_argument(
+        "--concurrency", type=int, default=None,
+        help="Max runs in flight at once (default: min(runs, CPU count))",
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help=f"Keep {RESULTS_LOG.name} and skip runs that already succeeded",
+    )
     args = parser.parse_args()
 
     models = [m.strip() for m in args.models.split(",")]
@@ -548,29 +715,28 @@ def main():
         print("No matching tests found.")
         return
 
-    n_runs = len(scenarios) * len(models)
+    tasks = [(s, m) for s in scenarios for m in models]
+    if args.resume:
+        done = {(r.test_id, r.model) for r in load_results(RESULTS_LOG) if not r.error}
+        tasks = [(s, m) for s, m in tasks if (s.id, m) not in done]
+    elif not args.dry_run:
+        RESULTS_LOG.unlink(missing_ok=True)
+    n_runs = len(tasks)
+    concurrency = args.concurrency or max(1, min(n_runs, os.cpu_count() or 1))
     mode = "DRY RUN" if args.dry_run else "LIVE"
     print(f"[{mode}] {len(scenarios)} tests × {len(models)} models = {n_runs} runs")
     print(f"Models: {', '.join(models)}")
     if not args.dry_run:
         print(f"Budget: ${args.budget}/test/model")
         print(f"Timeout: {args.timeout}s/test")
+    print(f"Concurrency: {concurrency}")
     print()
 
-    results: list[TestResult] = []
-    for scenario in scenarios:
-        print(f"[Test {scenario.id}] {scenario.name}")
-        for model in models:
-            result = run_single(
-                scenario, model,
-                budget=args.budget, timeout=args.timeout,
-                dry_run=args.dry_run,
-            )
-            results.append(result)
-        print()
+    asyncio.run(_run_all(tasks, args, concurrency))
+    print()
 
     if not args.dry_run:
-        report = generate_report(results, models)
+        report = generate_report(load_results(RESULTS_LOG), models)
         RESULTS_FILE.write_text(report)
         print(f"Report written to: {RESULTS_FILE}")
     else:
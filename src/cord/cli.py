@@ -2,52 +2,42 @@
 
 from __future__ import annotations
 
-import sys
+import argparse
 from pathlib import Path
 
 from cord.runtime.engine import Engine
 
 
-def main() -> None:
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cord")
+    sub = parser.add_subparsers(dest="command", metavar="command")
+
+    run_p = sub.add_parser("run", help="Run a goal to completion")
+    run_p.add_argument("goal", help="Goal description, or path to a file containing it")
+    run_p.add_argument("--budget", type=float, default=2.0,
+                       help="Max budget per agent in USD (default: 2.0)")
+    run_p.add_argument("--model", default="sonnet",
+                       help="Claude model for agents (default: sonnet)")
+    sub.add_parser("help", help="Show this message and exit")
+    return parser
+
+
+_PARSER = _build_parser()
+
+
+def main(argv: list[str] | None = None) -> None:
     """CLI entry point: cord run "goal" [--budget <usd>] [--model <model>]."""
-    args = sys.argv[1:]
-
-    if not args or args[0] in ("-h", "--help", "help"):
-        print("Usage:")
-        print('  cord run "goal description" [--budget <usd>] [--model <model>]')
-        print('  cord run plan.md [--budget <usd>] [--model <model>]')
-        sys.exit(0)
-
-    command = args[0]
-
-    if command == "run":
-        if len(args) < 2:
-            print('Usage: cord run "goal description" [--budget <usd>] [--model <model>]', file=sys.stderr)
-            sys.exit(1)
-
-        goal_arg = args[1]
-        goal_path = Path(goal_arg)
-        if goal_path.exists() and goal_path.is_file():
-            goal = goal_path.read_text().strip()
-        else:
-            goal = goal_arg
-
-        budget = 2.0
-        if "--budget" in args:
-            idx = args.index("--budget")
-            if idx + 1 < len(args):
-                budget = float(args[idx + 1])
-
-        model = "sonnet"
-        if "--model" in args:
-            idx = args.index("--model")
-            if idx + 1 < len(args):
-                model = args[idx + 1]
-
-        engine = Engine(goal, max_budget_usd=budget, model=model)
-        engine.run()
+    args = _PARSER.parse_args(argv)
+
+    if args.command in (None, "help"):
+        _PARSER.print_help()
+        return
 
+    goal_path = Path(args.goal)
+    if goal_path.exists() and goal_path.is_file():
+        goal = goal_path.read_text().strip()
     else:
-        print(f"Unknown command: {command}", file=sys.stderr)
-        print("Commands: run", file=sys.stderr)
-        sys.exit(1)
+        goal = args.goal
+
+    engine = Engine(goal, max_budget_usd=args.budget, model=args.model)
+    engine.run()
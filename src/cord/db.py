@@ -5,6 +5,8 @@ from __future__ import annotations
 import sqlite3
 import threading
 import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
 
@@ -19,6 +21,7 @@ CREATE TABLE IF NOT EXISTS nodes (
     prompt TEXT,
     returns TEXT DEFAULT 'text',
     result TEXT,
+    pending_deps_count INTEGER NOT NULL DEFAULT 0,
     created_at REAL NOT NULL,
     updated_at REAL NOT NULL
 );
@@ -29,8 +32,86 @@ CREATE TABLE IF NOT EXISTS dependencies (
     PRIMARY KEY (node_id, depends_on)
 );
 
+-- Closure table: one row per (node, strict ancestor) pair.
+CREATE TABLE IF NOT EXISTS node_ancestors (
+    descendant_id INTEGER NOT NULL REFERENCES nodes(id),
+    ancestor_id INTEGER NOT NULL REFERENCES nodes(id),
+    PRIMARY KEY (descendant_id, ancestor_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_ancestors_ancestor ON node_ancestors(ancestor_id);
 CREATE INDEX IF NOT EXISTS idx_nodes_parent ON nodes(parent_id);
-CREATE INDEX IF NOT EXISTS idx_nodes_status ON nodes(status);
+CREATE INDEX IF NOT EXISTS idx_nodes_parent_status ON nodes(parent_id, status);
+-- Also serves every lookup by status alone, so there is no separate (status) index.
+CREATE INDEX IF NOT EXISTS idx_nodes_ready ON nodes(status, pending_deps_count);
+CREATE INDEX IF NOT EXISTS idx_deps_depends_on ON dependencies(depends_on);
+
+CREATE TRIGGER IF NOT EXISTS trg_node_ancestors AFTER INSERT ON nodes
+WHEN NEW.parent_id IS NOT NULL
+BEGIN
+    INSERT INTO node_ancestors (descendant_id, ancestor_id)
+    SELECT NEW.id, ancestor_id FROM node_ancestors WHERE descendant_id = NEW.parent_id
+    UNION ALL SELECT NEW.id, NEW.parent_id;
+END;
+
+-- pending_deps_count tracks how many of a node's dependencies are not
+-- complete, so readiness is a column check instead of a join.
+CREATE TRIGGER IF NOT EXISTS trg_dependency_added AFTER INSERT ON dependencies
+WHEN (SELECT status FROM nodes WHERE id = NEW.depends_on) != 'complete'
+BEGIN
+    UPDATE nodes SET pending_deps_count = pending_deps_count + 1 WHERE id = NEW.node_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_dependency_completed AFTER UPDATE OF status ON nodes
+WHEN NEW.status = 'complete' AND OLD.status != 'complete'
+BEGIN
+    UPDATE nodes SET pending_deps_count = pending_deps_count - 1
+    WHERE id IN (SELECT node_id FROM dependencies WHERE depends_on = NEW.id);
+END;
+
+-- Parents leave 'complete' when relaunched for synthesis; their dependents
+-- must wait again.
+CREATE TRIGGER IF NOT EXISTS trg_dependency_reopened AFTER UPDATE OF status ON nodes
+WHEN OLD.status = 'complete' AND NEW.status != 'complete'
+BEGIN
+    UPDATE nodes SET pending_deps_count = pending_deps_count + 1
+    WHERE id IN (SELECT node_id FROM dependencies WHERE depends_on = NEW.id);
+END;
+"""
+
+# Databases created before pending_deps_count and node_ancestors existed:
+# add the column, create everything else, then backfill both from the
+# existing rows, all in one transaction.
+_MIGRATE_DERIVED_STATE = (
+    "BEGIN IMMEDIATE;\n"
+    "ALTER TABLE nodes ADD COLUMN pending_deps_count INTEGER NOT NULL DEFAULT 0;\n"
+    + SCHEMA
+    + """
+UPDATE nodes SET pending_deps_count = (
+    SELECT COUNT(*) FROM dependencies d JOIN nodes dep ON dep.id = d.depends_on
+    WHERE d.node_id = nodes.id AND dep.status != 'complete'
+);
+
+INSERT INTO node_ancestors (descendant_id, ancestor_id)
+WITH RECURSIVE anc(descendant_id, ancestor_id) AS (
+    SELECT id, parent_id FROM nodes WHERE parent_id IS NOT NULL
+    UNION ALL
+    SELECT a.descendant_id, n.parent_id FROM anc a JOIN nodes n ON n.id = a.ancestor_id
+    WHERE n.parent_id IS NOT NULL
+)
+SELECT descendant_id, ancestor_id FROM anc;
+
+COMMIT;
+"""
+)
+
+# Ids of a node and all of its descendants; bind the starting row id.
+_SUBTREE_CTE = """
+WITH RECURSIVE subtree(id) AS (
+    SELECT ?
+    UNION ALL
+    SELECT n.id FROM nodes n JOIN subtree s ON n.parent_id = s.id
+)
 """
 
 
@@ -39,29 +120,114 @@ def _node_id(row_id: int) -> str:
 
 
 def _row_id(node_id: str) -> int:
-    return int(node_id.lstrip("#"))
+    # removeprefix, not lstrip: "##3" is malformed, not an alias for "#3".
+    return int(node_id.removeprefix("#"))
+
+
+def _id_list(node_ids: list[str]) -> str:
+    """Row ids as a JSON array, bound to a single json_each(?) parameter."""
+    return "[" + ",".join(str(_row_id(nid)) for nid in node_ids) + "]"
 
 
 class CordDB:
     """Thread-safe SQLite coordination store."""
 
+    # Hot statements, kept as constants so every call hits the connection's
+    # prepared-statement cache with the same SQL text. Id lists are bound as
+    # one JSON array via _IN_IDS, so the text doesn't vary with list length.
+    _INSERT_NODE = (
+        "INSERT INTO nodes (node_type, goal, status, parent_id, prompt, returns, created_at, updated_at)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+    )
+    _INSERT_DEPENDENCY = "INSERT INTO dependencies (node_id, depends_on) VALUES (?, ?)"
+    _UPDATE_STATUS = "UPDATE nodes SET status = ?, updated_at = ? WHERE id = ?"
+    _SELECT_NODE = "SELECT * FROM nodes WHERE id = ?"
+    _SELECT_CHILDREN = "SELECT * FROM nodes WHERE parent_id = ? ORDER BY id"
+    _SELECT_NEEDS = "SELECT depends_on FROM dependencies WHERE node_id = ?"
+    _IN_IDS = "IN (SELECT value FROM json_each(?))"
+    # Spelled as the open statuses (the CHECK constraint makes this the same
+    # set) so it is three seeks on idx_nodes_ready; NOT IN would scan past
+    # every finished node first.
+    _SELECT_ANY_OPEN = (
+        "SELECT EXISTS(SELECT 1 FROM nodes WHERE status IN ('pending', 'active', 'paused'))"
+    )
+    _SELECT_READY = (
+        "SELECT * FROM nodes WHERE status = 'pending' AND pending_deps_count = 0 ORDER BY id"
+    )
+
     def __init__(self, db_path: Path | str = ":memory:"):
         self.db_path = str(db_path)
         self._local = threading.local()
+        self._writes = 0
         self._init_schema()
 
     @property
     def _conn(self) -> sqlite3.Connection:
         if not hasattr(self._local, "conn"):
-            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn = sqlite3.connect(self.db_path, timeout=10, cached_statements=256)
             conn.row_factory = sqlite3.Row
             conn.execute("PRAGMA journal_mode=WAL")
             conn.execute("PRAGMA foreign_keys=ON")
+            # WAL only needs fsync at checkpoints; the rest keeps hot pages
+            # and temp tables in memory. connect(timeout=10) already sets
+            # the busy timeout.
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA cache_size=-16000")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA mmap_size=134217728")
+            conn.execute("PRAGMA journal_size_limit=6144000")
             self._local.conn = conn
         return self._local.conn
 
+    def close(self) -> None:
+        """Close this thread's connection, checkpointing the WAL if it was the last."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            del self._local.conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Group several writes into one transaction and one commit.
+
+        Writes made inside the block join it instead of committing on their
+        own; an exception rolls the whole block back. Nested blocks join the
+        outermost one.
+        """
+        if getattr(self._local, "in_txn", False):
+            yield
+            return
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.in_txn = True
+        try:
+            yield
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+        finally:
+            self._local.in_txn = False
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """Connection for a single write, committed unless inside transaction()."""
+        conn = self._conn
+        if getattr(self._local, "in_txn", False):
+            yield conn
+        else:
+            with conn:
+                yield conn
+        self._writes += 1
+
     def _init_schema(self) -> None:
-        self._conn.executescript(SCHEMA)
+        conn = self._conn
+        columns = {r["name"] for r in conn.execute("PRAGMA table_info(nodes)")}
+        if columns and "pending_deps_count" not in columns:
+            conn.executescript(_MIGRATE_DERIVED_STATE)
+        else:
+            conn.executescript(SCHEMA)
 
     def create_node(
         self,
@@ -76,146 +242,283 @@ class CordDB:
         now = time.time()
         pid = _row_id(parent_id) if parent_id else None
 
-        cursor = self._conn.execute(
-            """INSERT INTO nodes (node_type, goal, status, parent_id, prompt, returns, created_at, updated_at)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-            (node_type, goal, status, pid, prompt, returns, now, now),
-        )
-        row_id = cursor.lastrowid
-
-        if needs:
-            for dep in needs:
-                self._conn.execute(
-                    "INSERT INTO dependencies (node_id, depends_on) VALUES (?, ?)",
-                    (row_id, _row_id(dep)),
+        with self._write() as conn:
+            cursor = conn.execute(
+                self._INSERT_NODE,
+                (node_type, goal, status, pid, prompt, returns, now, now),
+            )
+            row_id = cursor.lastrowid
+            if needs:
+                conn.executemany(
+                    self._INSERT_DEPENDENCY,
+                    [(row_id, _row_id(dep)) for dep in needs],
                 )
-
-        self._conn.commit()
         return _node_id(row_id)
 
+    def create_nodes_bulk(self, specs: list[dict]) -> list[str]:
+        """Create several nodes with one executemany, in a single transaction.
+
+        Each spec takes create_node's keyword arguments (node_type and goal
+        required). Returns the new node ids in spec order.
+        """
+        if not specs:
+            return []
+        now = time.time()
+        with self.transaction(), self._write() as conn:
+            # AUTOINCREMENT hands out seq + 1, seq + 2, ... and BEGIN IMMEDIATE
+            # keeps other writers out until we commit.
+            row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'nodes'").fetchone()
+            first = (row[0] if row else 0) + 1
+            conn.executemany(
+                self._INSERT_NODE,
+                [
+                    (
+                        spec["node_type"],
+                        spec["goal"],
+                        spec.get("status", "pending"),
+                        _row_id(spec["parent_id"]) if spec.get("parent_id") else None,
+                        spec.get("prompt"),
+                        spec.get("returns", "text"),
+                        now,
+                        now,
+                    )
+                    for spec in specs
+                ],
+            )
+            row_ids = range(first, first + len(specs))
+            deps = [
+                (row_id, _row_id(dep))
+                for row_id, spec in zip(row_ids, specs)
+                for dep in spec.get("needs") or ()
+            ]
+            if deps:
+                conn.executemany(self._INSERT_DEPENDENCY, deps)
+        return [_node_id(row_id) for row_id in row_ids]
+
     def update_status(self, node_id: str, status: str) -> None:
-        self._conn.execute(
-            "UPDATE nodes SET status = ?, updated_at = ? WHERE id = ?",
-            (status, time.time(), _row_id(node_id)),
-        )
-        self._conn.commit()
+        with self._write() as conn:
+            conn.execute(
+                self._UPDATE_STATUS,
+                (status, time.time(), _row_id(node_id)),
+            )
+
+    def bulk_update_status(self, node_ids: list[str], status: str) -> None:
+        """Set the same status on several nodes in one statement and one commit."""
+        if not node_ids:
+            return
+        with self._write() as conn:
+            conn.execute(
+                f"UPDATE nodes SET status = ?, updated_at = ? WHERE id {self._IN_IDS}",
+                (status, time.time(), _id_list(node_ids)),
+            )
+
+    def cancel_subtree(self, node_id: str) -> int:
+        """Cancel a node and all of its unfinished descendants in one statement.
+
+        Returns the number of nodes cancelled.
+        """
+        rid = _row_id(node_id)
+        with self._write() as conn:
+            cursor = conn.execute(
+                """UPDATE nodes SET status = 'cancelled', updated_at = ?
+                   WHERE (id = ? OR id IN (SELECT descendant_id FROM node_ancestors WHERE ancestor_id = ?))
+                   AND status IN ('pending', 'active', 'paused')""",
+                (time.time(), rid, rid),
+            )
+        return cursor.rowcount
 
     def modify_node(self, node_id: str, goal: str | None = None, prompt: str | None = None) -> None:
-        updates = []
-        params: list = []
-        if goal is not None:
-            updates.append("goal = ?")
-            params.append(goal)
-        if prompt is not None:
-            updates.append("prompt = ?")
-            params.append(prompt)
-        if not updates:
+        if goal is None and prompt is None:
             return
-        updates.append("updated_at = ?")
-        params.append(time.time())
-        params.append(_row_id(node_id))
-        self._conn.execute(
-            f"UPDATE nodes SET {', '.join(updates)} WHERE id = ?", params
-        )
-        self._conn.commit()
+        with self._write() as conn:
+            conn.execute(
+                """UPDATE nodes SET goal = COALESCE(?, goal), prompt = COALESCE(?, prompt),
+                   updated_at = ? WHERE id = ?""",
+                (goal, prompt, time.time(), _row_id(node_id)),
+            )
 
     def complete_node(self, node_id: str, result: str = "") -> None:
-        self._conn.execute(
-            "UPDATE nodes SET status = 'complete', result = ?, updated_at = ? WHERE id = ?",
-            (result, time.time(), _row_id(node_id)),
-        )
-        self._conn.commit()
-
-    def get_node(self, node_id: str) -> dict | None:
-        row = self._conn.execute(
-            "SELECT * FROM nodes WHERE id = ?", (_row_id(node_id),)
-        ).fetchone()
+        with self._write() as conn:
+            conn.execute(
+                "UPDATE nodes SET status = 'complete', result = ?, updated_at = ? WHERE id = ?",
+                (result, time.time(), _row_id(node_id)),
+            )
+
+    def revision(self) -> tuple[int, int]:
+        """Opaque value that changes whenever the database is written.
+
+        Combines this instance's own write count with SQLite's data_version,
+        which advances on commits from other connections (the MCP servers).
+        """
+        return (self._writes, self._conn.execute("PRAGMA data_version").fetchone()[0])
+
+    def get_node(self, node_id: str, with_deps: bool = True) -> dict | None:
+        """Fetch one node. Pass with_deps=False to skip loading its needs."""
+        row = self._conn.execute(self._SELECT_NODE, (_row_id(node_id),)).fetchone()
         if not row:
             return None
-        return self._row_to_dict(row)
+        return self._row_to_dict(row, self.get_needs(node_id) if with_deps else None)
 
     def get_children(self, node_id: str) -> list[dict]:
+        rows = self._conn.execute(self._SELECT_CHILDREN, (_row_id(node_id),)).fetchall()
+        return self._rows_to_dicts(rows)
+
+    def child_status_counts(self, node_id: str) -> dict[str, int]:
+        """Number of children per status, answered from the (parent_id, status) index."""
         rows = self._conn.execute(
-            "SELECT * FROM nodes WHERE parent_id = ? ORDER BY id",
+            "SELECT status, COUNT(*) FROM nodes WHERE parent_id = ? GROUP BY status",
             (_row_id(node_id),),
         ).fetchall()
-        return [self._row_to_dict(r) for r in rows]
+        return {r[0]: r[1] for r in rows}
+
+    def last_child_update(self, node_id: str) -> float | None:
+        """Latest updated_at among a node's children, or None if it has none."""
+        row = self._conn.execute(
+            "SELECT MAX(updated_at) FROM nodes WHERE parent_id = ?", (_row_id(node_id),)
+        ).fetchone()
+        return row[0]
 
     def get_needs(self, node_id: str) -> list[str]:
-        rows = self._conn.execute(
-            "SELECT depends_on FROM dependencies WHERE node_id = ?",
-            (_row_id(node_id),),
-        ).fetchall()
+        rows = self._conn.execute(self._SELECT_NEEDS, (_row_id(node_id),)).fetchall()
         return [_node_id(r["depends_on"]) for r in rows]
 
+    def is_descendant(self, node_id: str, ancestor_id: str) -> bool:
+        """True if node_id is strictly below ancestor_id in the tree."""
+        row = self._conn.execute(
+            "SELECT 1 FROM node_ancestors WHERE descendant_id = ? AND ancestor_id = ?",
+            (_row_id(node_id), _row_id(ancestor_id)),
+        ).fetchone()
+        return row is not None
+
     def get_root(self) -> dict | None:
         row = self._conn.execute(
             "SELECT * FROM nodes WHERE parent_id IS NULL ORDER BY id LIMIT 1"
         ).fetchone()
         if not row:
             return None
-        return self._row_to_dict(row)
+        return self._row_to_dict(row, self.get_needs(_node_id(row["id"])))
 
     def get_tree(self) -> dict | None:
-        root = self.get_root()
+        """Return the root node with nested children, in two queries total."""
+        root = self._conn.execute(
+            "SELECT id FROM nodes WHERE parent_id IS NULL ORDER BY id LIMIT 1"
+        ).fetchone()
         if not root:
             return None
-        self._attach_children(root)
-        return root
+        root_id = root["id"]
 
-    def find_ready_nodes(self) -> list[dict]:
-        """Find pending nodes whose dependencies are all complete."""
         rows = self._conn.execute(
-            """SELECT n.* FROM nodes n
-               WHERE n.status = 'pending'
-               AND NOT EXISTS (
-                   SELECT 1 FROM dependencies d
-                   JOIN nodes dep ON dep.id = d.depends_on
-                   WHERE d.node_id = n.id AND dep.status != 'complete'
-               )
-               ORDER BY n.id""",
+            _SUBTREE_CTE + "SELECT n.* FROM nodes n JOIN subtree s ON n.id = s.id ORDER BY n.id",
+            (root_id,),
         ).fetchall()
-        return [self._row_to_dict(r) for r in rows]
+        needs: dict[int, list[str]] = {}
+        for r in self._conn.execute(
+            _SUBTREE_CTE + """SELECT d.node_id, d.depends_on FROM dependencies d
+               JOIN subtree s ON d.node_id = s.id
+               ORDER BY d.node_id, d.depends_on""",
+            (root_id,),
+        ):
+            needs.setdefault(r["node_id"], []).append(_node_id(r["depends_on"]))
+
+        # Parents always have lower ids than their children, so walking in id
+        # order attaches every child after its parent and keeps siblings sorted.
+        by_id: dict[int, dict] = {}
+        for r in rows:
+            node = self._row_to_dict(r, needs.get(r["id"], []))
+            node["children"] = []
+            by_id[r["id"]] = node
+            if r["id"] != root_id:
+                by_id[r["parent_id"]]["children"].append(node)
+        return by_id[root_id]
+
+    def find_ready_nodes(self) -> list[dict]:
+        """Find pending nodes whose dependencies are all complete."""
+        rows = self._conn.execute(self._SELECT_READY).fetchall()
+        return self._rows_to_dicts(rows)
 
     def is_tree_complete(self) -> bool:
-        row = self._conn.execute(
-            "SELECT COUNT(*) as c FROM nodes WHERE status NOT IN ('complete', 'failed', 'cancelled')"
-        ).fetchone()
-        return row["c"] == 0
+        row = self._conn.execute(self._SELECT_ANY_OPEN).fetchone()
+        return row[0] == 0
 
     def get_completed_results(self, node_ids: list[str]) -> dict[str, str]:
-        results = {}
-        for nid in node_ids:
-            node = self.get_node(nid)
-            if node and node["status"] == "complete" and node["result"]:
-                results[nid] = node["result"]
-        return results
+        """Map each completed node with a non-empty result to it, in input order."""
+        if not node_ids:
+            return {}
+        rows = self._conn.execute(
+            f"""SELECT id, result FROM nodes
+                WHERE id {self._IN_IDS}
+                AND status = 'complete' AND result IS NOT NULL AND result != ''""",
+            (_id_list(node_ids),),
+        ).fetchall()
+        by_id = {r["id"]: r["result"] for r in rows}
+        return {nid: by_id[_row_id(nid)] for nid in node_ids if _row_id(nid) in by_id}
+
+    def get_goals(self, node_ids: list[str]) -> dict[str, str]:
+        """Map node ids to their goals in one query; missing ids are omitted."""
+        if not node_ids:
+            return {}
+        rows = self._conn.execute(
+            f"SELECT id, goal FROM nodes WHERE id {self._IN_IDS}", (_id_list(node_ids),)
+        ).fetchall()
+        return {_node_id(r["id"]): r["goal"] for r in rows}
 
     def get_goal_chain(self, node_id: str) -> list[tuple[str, str]]:
-        chain = []
-        current = self.get_node(node_id)
-        while current:
-            chain.append((current["node_id"], current["goal"]))
-            if current["parent_id"]:
-                current = self.get_node(current["parent_id"])
-            else:
-                current = None
-        chain.reverse()
-        return chain
+        """(node_id, goal) pairs from the root down to node_id, in one query."""
+        rows = self._conn.execute(
+            """WITH RECURSIVE chain(id, goal, parent_id, depth) AS (
+                   SELECT id, goal, parent_id, 0 FROM nodes WHERE id = ?
+                   UNION ALL
+                   SELECT n.id, n.goal, n.parent_id, c.depth + 1
+                   FROM nodes n JOIN chain c ON n.id = c.parent_id
+               )
+               SELECT id, goal FROM chain ORDER BY depth DESC""",
+            (_row_id(node_id),),
+        ).fetchall()
+        return [(_node_id(r["id"]), r["goal"]) for r in rows]
 
     def all_nodes(self) -> list[dict]:
         rows = self._conn.execute("SELECT * FROM nodes ORDER BY id").fetchall()
-        return [self._row_to_dict(r) for r in rows]
-
-    def _attach_children(self, node: dict) -> None:
-        children = self.get_children(node["node_id"])
-        node["children"] = children
-        for child in children:
-            self._attach_children(child)
-
-    def _row_to_dict(self, row: sqlite3.Row) -> dict:
+        needs: dict[int, list[str]] = {}
+        for r in self._conn.execute(
+            "SELECT node_id, depends_on FROM dependencies ORDER BY node_id, depends_on"
+        ):
+            needs.setdefault(r["node_id"], []).append(_node_id(r["depends_on"]))
+        return [self._row_to_dict(r, needs.get(r["id"], [])) for r in rows]
+
+    def snapshot_ids_and_status(self) -> list[dict]:
+        """Lightweight per-node (node_id, status, result) rows for diffing."""
+        rows = self._conn.execute(
+            "SELECT id, status, result FROM nodes ORDER BY id"
+        ).fetchall()
+        return [
+            {"node_id": _node_id(r["id"]), "status": r["status"], "result": r["result"]}
+            for r in rows
+        ]
+
+    def _needs_map(self, row_ids: list[int]) -> dict[int, list[str]]:
+        """Dependencies of several nodes in one query, keyed by row id."""
+        needs: dict[int, list[str]] = {}
+        for r in self._conn.execute(
+            f"""SELECT node_id, depends_on FROM dependencies
+                WHERE node_id {self._IN_IDS}
+                ORDER BY node_id, depends_on""",
+            ("[" + ",".join(map(str, row_ids)) + "]",),
+        ):
+            needs.setdefault(r["node_id"], []).append(_node_id(r["depends_on"]))
+        return needs
+
+    def _rows_to_dicts(self, rows: list[sqlite3.Row]) -> list[dict]:
+        """Convert rows, loading all of their needs with a single query."""
+        if not rows:
+            return []
+        needs = self._needs_map([r["id"] for r in rows])
+        return [self._row_to_dict(r, needs.get(r["id"], [])) for r in rows]
+
+    def _row_to_dict(self, row: sqlite3.Row, needs: list[str] | None = None) -> dict:
+        """Convert a row; the "needs" key is only set when the caller loaded it."""
         d = dict(row)
         d["node_id"] = _node_id(d["id"])
         d["parent_id"] = _node_id(d["parent_id"]) if d["parent_id"] else None
-        d["needs"] = self.get_needs(d["node_id"])
+        if needs is not None:
+            d["needs"] = needs
         return d
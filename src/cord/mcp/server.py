@@ -6,32 +6,56 @@ State is shared through SQLite (WAL mode for concurrent access).
 
 from __future__ import annotations
 
+import argparse
+import functools
 import json
-import sys
 
 from mcp.server.fastmcp import FastMCP
 
 from cord.db import CordDB
 
-# Parse CLI args
+# Set from CLI args by main(); tests assign them directly.
 agent_id: str | None = None
 db_path: str | None = None
 
-for i, arg in enumerate(sys.argv):
-    if arg == "--agent-id" and i + 1 < len(sys.argv):
-        agent_id = sys.argv[i + 1]
-    if arg == "--db-path" and i + 1 < len(sys.argv):
-        db_path = sys.argv[i + 1]
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="cord-mcp-server")
+    parser.add_argument("--agent-id")
+    parser.add_argument("--db-path")
+    return parser.parse_args(argv)
+
+
+@functools.lru_cache(maxsize=None)
+def _open_db(path: str) -> CordDB:
+    """One CordDB per path, so connections and schema setup are reused across tool calls."""
+    return CordDB(path)
 
 
 def _get_db() -> CordDB:
     if db_path:
-        return CordDB(db_path)
+        return _open_db(db_path)
     raise RuntimeError("No --db-path specified")
 
 
 def _node_to_json(node: dict) -> dict:
-    """Convert a node dict to a clean JSON-serializable dict."""
+    """Convert a node dict (and its nested children) to a clean JSON-serializable dict.
+
+    Walks the tree with an explicit stack so deep trees can't hit the recursion limit.
+    """
+    root = _node_fields(node)
+    stack = [(node, root)]
+    while stack:
+        src, dst = stack.pop()
+        children = src.get("children")
+        if children:
+            dst["children"] = converted = [_node_fields(c) for c in children]
+            stack.extend(zip(children, converted))
+    return root
+
+
+def _node_fields(node: dict) -> dict:
+    """JSON fields for one node, without children."""
     d: dict = {
         "id": node["node_id"],
         "type": node["node_type"],
@@ -46,8 +70,6 @@ def _node_to_json(node: dict) -> dict:
         d["result"] = node["result"]
     if node.get("needs"):
         d["needs"] = node["needs"]
-    if node.get("children"):
-        d["children"] = [_node_to_json(c) for c in node["children"]]
     return d
 
 
@@ -61,7 +83,7 @@ def read_tree() -> str:
     tree = db.get_tree()
     if not tree:
         return json.dumps({"error": "No tree found"})
-    return json.dumps(_node_to_json(tree), indent=2)
+    return json.dumps(_node_to_json(tree), separators=(",", ":"), ensure_ascii=False)
 
 
 @mcp.tool()
@@ -71,7 +93,7 @@ def read_node(node_id: str) -> str:
     node = db.get_node(node_id)
     if not node:
         return json.dumps({"error": f"Node {node_id} not found"})
-    return json.dumps(_node_to_json(node), indent=2)
+    return json.dumps(_node_to_json(node), separators=(",", ":"), ensure_ascii=False)
 
 
 @mcp.tool()
@@ -123,32 +145,25 @@ def ask(question: str, options: list[str] | None = None,
     return json.dumps({"created": new_id, "question": question})
 
 
-def _is_descendant(db: CordDB, agent_id: str, target_id: str) -> bool:
-    """Check if target_id is a descendant of agent_id."""
-    node = db.get_node(target_id)
-    while node and node["parent_id"]:
-        if node["parent_id"] == agent_id:
-            return True
-        node = db.get_node(node["parent_id"])
-    return False
-
-
 @mcp.tool()
 def stop(node_id: str) -> str:
-    """Cancel a node in your subtree."""
+    """Cancel a node in your subtree, along with its unfinished descendants."""
     db = _get_db()
     if err := _check_subtree(db, node_id):
         return err
-    db.update_status(node_id, "cancelled")
-    return json.dumps({"cancelled": node_id})
+    count = db.cancel_subtree(node_id)
+    if not count:
+        node = db.get_node(node_id, with_deps=False)
+        return json.dumps({"error": f"Node {node_id} is {node['status']} and has no unfinished descendants. Nothing to cancel."})
+    return json.dumps({"cancelled": node_id, "count": count})
 
 
 def _check_subtree(db: CordDB, node_id: str) -> str | None:
     """Return error JSON if node is missing or not in agent's subtree, else None."""
-    node = db.get_node(node_id)
+    node = db.get_node(node_id, with_deps=False)
     if not node:
         return json.dumps({"error": f"Node {node_id} not found"})
-    if agent_id and not _is_descendant(db, agent_id, node_id):
+    if agent_id and not db.is_descendant(node_id, agent_id):
         return json.dumps({
             "error": f"Node {node_id} is not in your subtree. "
             "You can only modify your own descendants. "
@@ -163,7 +178,7 @@ def pause(node_id: str) -> str:
     db = _get_db()
     if err := _check_subtree(db, node_id):
         return err
-    node = db.get_node(node_id)
+    node = db.get_node(node_id, with_deps=False)
     if node["status"] != "active":
         return json.dumps({"error": f"Node {node_id} is {node['status']}, not active. Only active nodes can be paused."})
     db.update_status(node_id, "paused")
@@ -176,7 +191,7 @@ def resume(node_id: str) -> str:
     db = _get_db()
     if err := _check_subtree(db, node_id):
         return err
-    node = db.get_node(node_id)
+    node = db.get_node(node_id, with_deps=False)
     if node["status"] != "paused":
         return json.dumps({"error": f"Node {node_id} is {node['status']}, not paused. Only paused nodes can be resumed."})
     db.update_status(node_id, "pending")
@@ -189,18 +204,21 @@ def modify(node_id: str, goal: str | None = None, prompt: str | None = None) ->
     db = _get_db()
     if err := _check_subtree(db, node_id):
         return err
-    node = db.get_node(node_id)
+    node = db.get_node(node_id, with_deps=False)
     if node["status"] not in ("pending", "paused"):
         return json.dumps({"error": f"Node {node_id} is {node['status']}. Only pending or paused nodes can be modified."})
     if goal is None and prompt is None:
         return json.dumps({"error": "Provide at least one of goal or prompt to modify."})
     db.modify_node(node_id, goal=goal, prompt=prompt)
-    updated = db.get_node(node_id)
+    updated = db.get_node(node_id, with_deps=False)
     return json.dumps({"modified": node_id, "goal": updated["goal"]})
 
 
 def main():
     """Entry point for cord-mcp-server."""
+    global agent_id, db_path
+    args = _parse_args()
+    agent_id, db_path = args.agent_id, args.db_path
     mcp.run(transport="stdio")
 
 
@@ -4,6 +4,42 @@ from __future__ import annotations
 
 from cord.db import CordDB
 
+# Static sections are built once at import time; only the small dynamic
+# slots are formatted per call. Each section ends with its trailing blank line.
+_AGENT_HEADER = "You are node {node_id} in a coordination tree.\nYour goal: {goal}\n\n"
+_CHAIN_LINE = '  {indent}{node_id} "{goal}"{marker}\n'
+_RESULT_SECTION = "--- {label} ---\n{result}\n\n"
+
+_TOOL_INSTRUCTIONS_BLOCK = """\
+You have MCP tools available for coordination:
+- create(goal, prompt, returns, needs): Create a child task. Use needs to list node IDs it depends on.
+- complete(result): Mark your task done with a result
+- read_tree(): View the full coordination tree
+
+WORKFLOW:
+1. Assess whether your task has independent parts
+2. If yes: create children, then call complete()
+3. If no: do the work, then call complete()
+
+needs = child waits for listed nodes to complete. Their full results are injected into the child's prompt.
+If a child would need results from many nodes, create an intermediate task to synthesize them first.
+Prefer deeper trees over wide fan-ins — each level of depth is a natural compression boundary.
+
+IMPORTANT: When you are done, you MUST call the `complete` tool with your result.
+
+"""
+
+_SYNTHESIS_HEADER = (
+    'You are node {node_id}: "{goal}"\n\n'
+    "Your child tasks have completed. Here are their results:\n\n"
+)
+_SYNTHESIS_FOOTER = """\
+Synthesize the results from your child tasks into your final output.
+
+IMPORTANT: When you are done, you MUST call the `complete` tool with your result.
+
+"""
+
 
 def build_agent_prompt(db: CordDB, node_id: str) -> str:
     """Build the full prompt for an agent invocation."""
@@ -11,111 +47,85 @@ def build_agent_prompt(db: CordDB, node_id: str) -> str:
     if not node:
         return ""
 
-    parts = []
-
     # 1. Identity and goal
-    parts.append(f"You are node {node_id} in a coordination tree.")
-    parts.append(f"Your goal: {node['goal']}")
-    parts.append("")
+    parts = [_AGENT_HEADER.format(node_id=node_id, goal=node["goal"])]
 
     # Goal chain for context
     goal_chain = db.get_goal_chain(node_id)
     if len(goal_chain) > 1:
-        parts.append("Goal chain:")
-        for i, (nid, goal) in enumerate(goal_chain):
-            indent = "  " * i
-            marker = " <- your task" if nid == node_id else ""
-            parts.append(f"  {indent}{nid} \"{goal}\"{marker}")
-        parts.append("")
+        parts.append("Goal chain:\n")
+        parts.extend(
+            _CHAIN_LINE.format(
+                indent="  " * i,
+                node_id=nid,
+                goal=goal,
+                marker=" <- your task" if nid == node_id else "",
+            )
+            for i, (nid, goal) in enumerate(goal_chain)
+        )
+        parts.append("\n")
 
     # 2. Results from needed nodes
     needs = node["needs"]
     if needs:
         results = db.get_completed_results(needs)
         if results:
-            parts.append("Results from needed nodes:")
-            parts.append("")
+            goals = db.get_goals(list(results))
+            parts.append("Results from needed nodes:\n\n")
             for dep_id, result in results.items():
-                dep = db.get_node(dep_id)
-                dep_label = f"{dep_id} \"{dep['goal']}\"" if dep else dep_id
-                parts.append(f"--- {dep_label} ---")
-                parts.append(result)
-                parts.append("")
+                goal = goals.get(dep_id)
+                dep_label = f"{dep_id} \"{goal}\"" if goal is not None else dep_id
+                parts.append(_RESULT_SECTION.format(label=dep_label, result=result))
 
     # 3. Node's own prompt
     if node.get("prompt"):
-        parts.append("Your task:")
-        parts.append(node["prompt"])
-        parts.append("")
+        parts.append(f"Your task:\n{node['prompt']}\n\n")
 
     # 4. MCP tool instructions
-    parts.append("You have MCP tools available for coordination:")
-    parts.append("- create(goal, prompt, returns, needs): Create a child task. Use needs to list node IDs it depends on.")
-    parts.append("- complete(result): Mark your task done with a result")
-    parts.append("- read_tree(): View the full coordination tree")
-    parts.append("")
-    parts.append("WORKFLOW:")
-    parts.append("1. Assess whether your task has independent parts")
-    parts.append("2. If yes: create children, then call complete()")
-    parts.append("3. If no: do the work, then call complete()")
-    parts.append("")
-    parts.append("needs = child waits for listed nodes to complete. Their full results are injected into the child's prompt.")
-    parts.append("If a child would need results from many nodes, create an intermediate task to synthesize them first.")
-    parts.append("Prefer deeper trees over wide fan-ins — each level of depth is a natural compression boundary.")
-    parts.append("")
-    parts.append("IMPORTANT: When you are done, you MUST call the `complete` tool with your result.")
-    parts.append("")
+    parts.append(_TOOL_INSTRUCTIONS_BLOCK)
 
     # 5. Output format instructions
     returns = node.get("returns") or "text"
     parts.append(_output_instructions(returns))
 
-    return "\n".join(parts)
+    return "".join(parts)
 
 
 def build_synthesis_prompt(db: CordDB, node_id: str) -> str:
     """Build prompt for synthesis phase (after children complete)."""
-    node = db.get_node(node_id)
+    node = db.get_node(node_id, with_deps=False)
     if not node:
         return ""
 
-    parts = []
-
-    parts.append(f"You are node {node_id}: \"{node['goal']}\"")
-    parts.append("")
-    parts.append("Your child tasks have completed. Here are their results:")
-    parts.append("")
+    parts = [_SYNTHESIS_HEADER.format(node_id=node_id, goal=node["goal"])]
 
     children = db.get_children(node_id)
-    for child in children:
-        if child["status"] == "complete" and child.get("result"):
-            parts.append(f"--- {child['node_id']} \"{child['goal']}\" ---")
-            parts.append(child["result"])
-            parts.append("")
+    parts.extend(
+        _RESULT_SECTION.format(label=f"{c['node_id']} \"{c['goal']}\"", result=c["result"])
+        for c in children
+        if c["status"] == "complete" and c.get("result")
+    )
 
     if node.get("prompt"):
-        parts.append("Original instructions:")
-        parts.append(node["prompt"])
-        parts.append("")
+        parts.append(f"Original instructions:\n{node['prompt']}\n\n")
 
-    parts.append("Synthesize the results from your child tasks into your final output.")
-    parts.append("")
-    parts.append("IMPORTANT: When you are done, you MUST call the `complete` tool with your result.")
-    parts.append("")
+    parts.append(_SYNTHESIS_FOOTER)
 
     returns = node.get("returns") or "text"
     parts.append(_output_instructions(returns))
 
-    return "\n".join(parts)
+    return "".join(parts)
+
+
+_OUTPUT_INSTRUCTIONS: dict[str, str] = {
+    "text": "Output your result as plain text.",
+    "list": "Output ONLY a JSON array. No markdown formatting, no explanation.",
+    "structured": "Output ONLY valid JSON. No markdown formatting, no explanation.",
+    "file": "Write your result to a file and output the file path.",
+    "boolean": "Output ONLY 'true' or 'false'. No explanation.",
+    "approval": "Output ONLY 'approved' or 'rejected'. No explanation.",
+}
 
 
 def _output_instructions(returns: str) -> str:
-    instructions = {
-        "text": "Output your result as plain text.",
-        "list": "Output ONLY a JSON array. No markdown formatting, no explanation.",
-        "structured": "Output ONLY valid JSON. No markdown formatting, no explanation.",
-        "file": "Write your result to a file and output the file path.",
-        "boolean": "Output ONLY 'true' or 'false'. No explanation.",
-        "approval": "Output ONLY 'approved' or 'rejected'. No explanation.",
-    }
-    return instructions.get(returns, f"Output your result (expected type: {returns}).")
+    return _OUTPUT_INSTRUCTIONS.get(returns, f"Output your result (expected type: {returns}).")
@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
+import functools
 import json
+import os
+import shutil
 import subprocess
 from pathlib import Path
 
 
-MCP_TOOLS = [
+MCP_TOOLS = (
     "mcp__cord__read_tree",
     "mcp__cord__read_node",
     "mcp__cord__create",
@@ -17,27 +20,64 @@ MCP_TOOLS = [
     "mcp__cord__pause",
     "mcp__cord__resume",
     "mcp__cord__modify",
-]
+)
+MCP_TOOLS_JOINED = " ".join(MCP_TOOLS)
+
+
+@functools.lru_cache(maxsize=None)
+def _server_args(db_path: Path, project_dir: Path) -> tuple[str, ...]:
+    """MCP server args shared by every agent of a run; only --agent-id varies."""
+    return (
+        "run",
+        "--directory", str(project_dir),
+        "cord-mcp-server",
+        "--db-path", str(db_path),
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def _which(name: str, search_path: str) -> str | None:
+    return shutil.which(name, path=search_path)
+
+
+def _claude_binary() -> str:
+    """Absolute path of the claude CLI, looked up once per PATH value.
+
+    Falls back to the bare name so a missing binary still fails in Popen.
+    """
+    return _which("claude", os.environ.get("PATH", os.defpath)) or "claude"
 
 
 def generate_mcp_config(db_path: Path, agent_id: str, project_dir: Path) -> dict:
-    """Generate MCP config that spawns a stdio server for this agent."""
+    """Generate MCP config that spawns a stdio server for this agent.
+
+    Paths are used as given, so pass absolute ones: the server runs with
+    project_dir as its working directory.
+    """
     return {
         "mcpServers": {
             "cord": {
                 "command": "uv",
-                "args": [
-                    "run",
-                    "--directory", str(project_dir.resolve()),
-                    "cord-mcp-server",
-                    "--db-path", str(db_path.resolve()),
-                    "--agent-id", agent_id,
-                ],
+                "args": [*_server_args(db_path, project_dir), "--agent-id", agent_id],
             }
         }
     }
 
 
+@functools.lru_cache(maxsize=None)
+def _mcp_config_parts(db_path: Path, project_dir: Path) -> tuple[str, str]:
+    """Serialized MCP config split around the agent id, shared by every agent of a run."""
+    config = json.dumps(generate_mcp_config(db_path, "\0", project_dir), separators=(",", ":"))
+    head, _, tail = config.rpartition('"\\u0000"')
+    return head, tail
+
+
+def _mcp_config_json(db_path: Path, agent_id: str, project_dir: Path) -> str:
+    """Same JSON as json.dumps(generate_mcp_config(...)), without re-encoding the shared parts."""
+    head, tail = _mcp_config_parts(db_path, project_dir)
+    return head + json.dumps(agent_id) + tail
+
+
 def launch_agent(
     db_path: Path,
     node_id: str,
@@ -46,22 +86,18 @@ def launch_agent(
     max_budget_usd: float = 2.0,
     model: str = "sonnet",
     project_dir: Path | None = None,
-) -> subprocess.Popen[str]:
+) -> subprocess.Popen[bytes]:
     """Launch a claude CLI process for a node."""
     proj = project_dir or db_path.parent
-    mcp_config = generate_mcp_config(db_path, node_id, proj)
-
-    config_dir = db_path.parent / ".cord"
-    config_dir.mkdir(parents=True, exist_ok=True)
-    config_path = config_dir / f"mcp-{node_id.lstrip('#')}.json"
-    config_path.write_text(json.dumps(mcp_config, indent=2))
+    # --mcp-config accepts inline JSON, so nothing is written to disk per launch.
+    mcp_config = _mcp_config_json(db_path, node_id, proj)
 
     cmd = [
-        "claude",
+        _claude_binary(),
         "-p", prompt,
         "--model", model,
-        "--mcp-config", str(config_path),
-        "--allowedTools", " ".join(MCP_TOOLS),
+        "--mcp-config", mcp_config,
+        "--allowedTools", MCP_TOOLS_JOINED,
         "--dangerously-skip-permissions",
         "--max-budget-usd", str(max_budget_usd),
     ]
@@ -71,8 +107,10 @@ def launch_agent(
     process = subprocess.Popen(
         cmd,
         stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
+        # Nothing reads stderr; a pipe would stall the agent once it filled.
+        stderr=subprocess.DEVNULL,
+        # Own process group, so cancelling the agent also stops its MCP server.
+        start_new_session=True,
         cwd=cwd,
     )
 
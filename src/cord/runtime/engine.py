@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import re
+import signal
 import sys
-import time
+import threading
 from pathlib import Path
 
 from cord.db import CordDB
@@ -11,6 +13,30 @@ from cord.prompts import build_agent_prompt, build_synthesis_prompt
 from cord.runtime.dispatcher import launch_agent
 from cord.runtime.process_manager import ProcessManager
 
+# "Default: <answer>" line in an ask node's prompt
+_DEFAULT_RE = re.compile(r"^Default:(.*)$", re.MULTILINE)
+
+# Agents run in their own sessions, so the terminal's hangup no longer
+# reaches them; these are turned into KeyboardInterrupt to cancel them.
+_SHUTDOWN_SIGNALS = tuple(
+    getattr(signal, name) for name in ("SIGHUP", "SIGTERM", "SIGQUIT") if hasattr(signal, name)
+)
+
+_RESET = "\033[0m"
+_DIM = "\033[2m"
+_BOLD = "\033[1m"
+_CYAN = "\033[36m"
+
+_DEFAULT_STYLE = ("\033[0m", "?")
+_STATUS_STYLE: dict[str, tuple[str, str]] = {
+    "pending":   ("\033[90m", "○"),
+    "active":    ("\033[34m", "●"),
+    "complete":  ("\033[32m", "✓"),
+    "failed":    ("\033[31m", "✗"),
+    "cancelled": ("\033[33m", "⊘"),
+    "waiting":   ("\033[36m", "?"),
+}
+
 
 class Engine:
     """Main execution engine for cord.
@@ -29,7 +55,8 @@ class Engine:
     ):
         self.goal = goal
         self.project_dir = (project_dir or Path.cwd()).resolve()
-        self.db_path = db_path or (self.project_dir / ".cord" / "cord.db")
+        # Resolved once here; the dispatcher passes these paths through as-is.
+        self.db_path = (db_path or (self.project_dir / ".cord" / "cord.db")).resolve()
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         # Fresh DB for each run
         if self.db_path.exists():
@@ -39,7 +66,9 @@ class Engine:
         self.model = model
         self.process_manager = ProcessManager()
         self.db = CordDB(self.db_path)
-        self._last_tree_hash = ""
+        self._last_render_key: tuple | None = None
+        # parent_id -> children status signature it was last synthesized for
+        self._synthesis_signatures: dict[str, tuple] = {}
 
     def run(self) -> None:
         """Run the engine to completion."""
@@ -53,19 +82,42 @@ class Engine:
             status="active",
         )
 
-        # Launch root agent
-        self._launch_node(root_id)
-        self._print_tree()
-
+        previous = self._install_signal_handlers()
         try:
+            # Launch root agent
+            self._launch_node(root_id)
+            self._print_tree()
             self._main_loop()
         except KeyboardInterrupt:
             self._log("\nInterrupted. Cancelling all agents...")
             self.process_manager.cancel_all()
-            for node in self.db.all_nodes():
-                if node["status"] == "active":
-                    self.db.update_status(node["node_id"], "cancelled")
+            active = [
+                n["node_id"] for n in self.db.snapshot_ids_and_status()
+                if n["status"] == "active"
+            ]
+            self.db.bulk_update_status(active, "cancelled")
             self._print_tree()
+        except BaseException:
+            # Don't leave detached agents spending budget after a crash.
+            self.process_manager.cancel_all()
+            raise
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+    def _install_signal_handlers(self) -> dict[int, object]:
+        """Route hangup/termination through the KeyboardInterrupt cleanup.
+
+        Returns the previous handlers so run() can restore them. Only the
+        main thread may set handlers; elsewhere this is a no-op.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return {}
+
+        def interrupt(signum, frame):
+            raise KeyboardInterrupt
+
+        return {signum: signal.signal(signum, interrupt) for signum in _SHUTDOWN_SIGNALS}
 
     def _main_loop(self) -> None:
         while True:
@@ -101,7 +153,9 @@ class Engine:
                     self._log(f"Stuck: {len(pending)} pending nodes with unmet dependencies")
                 break
 
-            time.sleep(self.poll_interval)
+            # Wakes as soon as an agent exits; the timeout bounds how long
+            # DB changes made by agents' MCP servers take to show up.
+            self.process_manager.wait(self.poll_interval)
 
     def _launch_node(self, node_id: str) -> None:
         prompt = build_agent_prompt(self.db, node_id)
@@ -118,13 +172,13 @@ class Engine:
         self.process_manager.register(node_id, process)
 
     def _handle_completion(self, node_id: str, return_code: int, stdout: str) -> None:
-        node = self.db.get_node(node_id)
+        node = self.db.get_node(node_id, with_deps=False)
         if not node:
             return
 
         if return_code == 0:
             # Agent completed — check if it already called complete() via MCP
-            refreshed = self.db.get_node(node_id)
+            refreshed = self.db.get_node(node_id, with_deps=False)
             if refreshed and refreshed["status"] != "complete":
                 # Agent exited without calling complete(), use stdout as result
                 self.db.complete_node(node_id, stdout.strip()[:500])
@@ -136,30 +190,38 @@ class Engine:
 
     def _check_synthesis(self, completed_node_id: str) -> None:
         """Check if a parent needs synthesis after a child completes."""
-        node = self.db.get_node(completed_node_id)
+        node = self.db.get_node(completed_node_id, with_deps=False)
         if not node or not node["parent_id"]:
             return
 
         parent_id = node["parent_id"]
-        children = self.db.get_children(parent_id)
+        counts = self.db.child_status_counts(parent_id)
 
         all_done = all(
-            c["status"] in ("complete", "failed", "cancelled")
-            for c in children
+            status in ("complete", "failed", "cancelled")
+            for status in counts
         )
         if not all_done:
             return
 
         # Don't synthesize if no children
-        if not children:
+        if not counts:
+            return
+
+        # Sibling completions handled in the same poll all see the finished
+        # set; only the first one relaunches the parent. The latest child
+        # update keeps a child that re-completes after its own synthesis
+        # from looking like the set the parent already saw.
+        signature = (tuple(sorted(counts.items())), self.db.last_child_update(parent_id))
+        if self._synthesis_signatures.get(parent_id) == signature:
             return
+        self._synthesis_signatures[parent_id] = signature
 
-        successful = [c for c in children if c["status"] == "complete"]
-        if not successful:
+        if not counts.get("complete"):
             self.db.update_status(parent_id, "failed")
             return
 
-        parent = self.db.get_node(parent_id)
+        parent = self.db.get_node(parent_id, with_deps=False)
         if not parent:
             return
 
@@ -182,29 +244,24 @@ class Engine:
         self._print_tree()
 
         # Display question
-        bold = "\033[1m"
-        cyan = "\033[36m"
-        reset = "\033[0m"
-        dim = "\033[2m"
-
-        print(f"\n{cyan}{bold}? {node['goal']}{reset}", file=sys.stderr)
+        print(f"\n{_CYAN}{_BOLD}? {node['goal']}{_RESET}", file=sys.stderr)
         if node.get("prompt") and node["prompt"] != node["goal"]:
             # Show options/default from prompt
             for line in node["prompt"].split("\n"):
                 if line != node["goal"]:
-                    print(f"  {dim}{line}{reset}", file=sys.stderr)
+                    print(f"  {_DIM}{line}{_RESET}", file=sys.stderr)
         print(file=sys.stderr)
 
         try:
-            answer = input(f"{cyan}> {reset}").strip()
+            answer = input(f"{_CYAN}> {_RESET}").strip()
         except (EOFError, KeyboardInterrupt):
             answer = ""
 
-        if not answer and node.get("prompt") and "Default:" in node["prompt"]:
-            # Extract default
-            for line in node["prompt"].split("\n"):
-                if line.startswith("Default:"):
-                    answer = line.split(":", 1)[1].strip()
+        if not answer and node.get("prompt"):
+            # Extract default; the last "Default:" line wins
+            defaults = _DEFAULT_RE.findall(node["prompt"])
+            if defaults:
+                answer = defaults[-1].strip()
 
         self.db.complete_node(node["node_id"], answer or "(no answer)")
         self._check_synthesis(node["node_id"])
@@ -213,15 +270,16 @@ class Engine:
 
     def _print_tree(self) -> None:
         """Clear screen and print the colored status tree."""
-        tree = self.db.get_tree()
-        if not tree:
+        # Skip the tree query entirely when neither the DB nor the set of
+        # running agents has changed since the last render.
+        render_key = (self.db.revision(), frozenset(self.process_manager.active_node_ids))
+        if render_key == self._last_render_key:
             return
+        self._last_render_key = render_key
 
-        # Simple change detection
-        h = hash(str(tree))
-        if h == self._last_tree_hash:
+        tree = self.db.get_tree()
+        if not tree:
             return
-        self._last_tree_hash = h
 
         lines = [f"\033[2J\033[H\033[1mcord run\033[0m", ""]
         self._render_node(tree, 0, lines)
@@ -232,41 +290,32 @@ class Engine:
         print("\n".join(lines), file=sys.stderr)
 
     def _render_node(self, node: dict, depth: int, lines: list[str]) -> None:
-        prefix = "  " * depth
-        color, icon = _status_style(node["status"])
-        reset = "\033[0m"
-        dim = "\033[2m"
-        bold = "\033[1m"
-
-        lines.append(
-            f"  {prefix}{color}{icon} {bold}{node['node_id']}{reset} "
-            f"{color}[{node['status']}]{reset} "
-            f"{dim}{node['node_type'].upper()}{reset} {node['goal']}"
-        )
-
-        if node.get("needs"):
-            deps = ", ".join(node["needs"])
-            lines.append(f"  {prefix}  {dim}needs: {deps}{reset}")
-
-        if node.get("result"):
-            preview = node["result"][:60].replace("\n", " ")
-            if len(node["result"]) > 60:
-                preview += "..."
-            lines.append(f"  {prefix}  {dim}result: {preview}{reset}")
-
-        for child in node.get("children", []):
-            self._render_node(child, depth + 1, lines)
+        """Append display lines for node and its subtree, depth-first."""
+        stack = [(node, depth)]
+        while stack:
+            node, depth = stack.pop()
+            prefix = "  " * depth
+            color, icon = _STATUS_STYLE.get(node["status"], _DEFAULT_STYLE)
+
+            lines.append(
+                f"  {prefix}{color}{icon} {_BOLD}{node['node_id']}{_RESET} "
+                f"{color}[{node['status']}]{_RESET} "
+                f"{_DIM}{node['node_type'].upper()}{_RESET} {node['goal']}"
+            )
+
+            if node.get("needs"):
+                deps = ", ".join(node["needs"])
+                lines.append(f"  {prefix}  {_DIM}needs: {deps}{_RESET}")
+
+            if node.get("result"):
+                preview = node["result"][:60].replace("\n", " ")
+                if len(node["result"]) > 60:
+                    preview += "..."
+                lines.append(f"  {prefix}  {_DIM}result: {preview}{_RESET}")
+
+            children = node.get("children")
+            if children:
+                stack.extend((child, depth + 1) for child in reversed(children))
 
     def _log(self, message: str) -> None:
         print(message, file=sys.stderr)
-
-
-def _status_style(status: str) -> tuple[str, str]:
-    return {
-        "pending":   ("\033[90m", "○"),
-        "active":    ("\033[34m", "●"),
-        "complete":  ("\033[32m", "✓"),
-        "failed":    ("\033[31m", "✗"),
-        "cancelled": ("\033[33m", "⊘"),
-        "waiting":   ("\033[36m", "?"),
-    }.get(status, ("\033[0m", "?"))
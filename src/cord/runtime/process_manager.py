@@ -3,16 +3,21 @@
 from __future__ import annotations
 
 import os
+import selectors
 import signal
 import subprocess
+import time
+from collections.abc import KeysView
 from dataclasses import dataclass, field
 
+_READ_SIZE = 65536
 
-@dataclass
+
+@dataclass(slots=True)
 class ProcessInfo:
     node_id: str
-    process: subprocess.Popen[str]
-    stdout_lines: list[str] = field(default_factory=list)
+    process: subprocess.Popen[bytes]
+    stdout_chunks: list[bytes] = field(default_factory=list)
 
 
 class ProcessManager:
@@ -20,10 +25,35 @@ class ProcessManager:
 
     def __init__(self) -> None:
         self._processes: dict[str, ProcessInfo] = {}
+        # Every child not yet reaped, including ones superseded by a later
+        # register() for the same node (e.g. a parent relaunched for synthesis
+        # while its first run is still exiting).
+        self._by_pid: dict[int, ProcessInfo] = {}
+        self._selector = selectors.DefaultSelector()
+
+    def register(self, node_id: str, process: subprocess.Popen[bytes]) -> None:
+        """Register a subprocess for a node, superseding any earlier one.
+
+        A superseded process is still drained and reaped, but its exit is
+        never reported.
+        """
+        info = ProcessInfo(node_id=node_id, process=process)
+        self._processes[node_id] = info
+        self._by_pid[process.pid] = info
+        if process.stdout:
+            self._selector.register(process.stdout.fileno(), selectors.EVENT_READ, info)
+
+    def wait(self, timeout: float) -> None:
+        """Block until some child writes output or exits, or timeout elapses.
 
-    def register(self, node_id: str, process: subprocess.Popen[str]) -> None:
-        """Register a subprocess for a node."""
-        self._processes[node_id] = ProcessInfo(node_id=node_id, process=process)
+        Output is buffered as it arrives, so a child can never stall on a full
+        stdout pipe while the engine is waiting.
+        """
+        if not self._selector.get_map():
+            time.sleep(timeout)
+            return
+        for key, _ in self._selector.select(timeout):
+            self._read_chunk(key.fd, key.data)
 
     def poll_completions(self) -> list[tuple[str, int, str]]:
         """Poll all registered processes for completions.
@@ -31,36 +61,109 @@ class ProcessManager:
         Returns list of (node_id, return_code, stdout) for completed processes.
         """
         completed = []
-        for node_id, info in list(self._processes.items()):
-            rc = info.process.poll()
-            if rc is not None:
-                stdout = ""
-                if info.process.stdout:
-                    stdout = info.process.stdout.read() or ""
-                completed.append((node_id, rc, stdout))
-                del self._processes[node_id]
+        for info in self._exited():
+            if info.process.stdout:
+                fd = info.process.stdout.fileno()
+                while self._read_chunk(fd, info):
+                    pass
+            del self._by_pid[info.process.pid]
+            if self._processes.get(info.node_id) is not info:
+                continue
+            stdout = b"".join(info.stdout_chunks).decode("utf-8", errors="replace")
+            completed.append((info.node_id, info.process.returncode, stdout))
+            del self._processes[info.node_id]
         return completed
 
+    def _exited(self) -> list[ProcessInfo]:
+        """Reap exited children, in one waitid probe per exit where supported.
+
+        waitid(WNOWAIT) only peeks at the next exited child; Popen.poll() then
+        reaps it so Popen keeps its returncode bookkeeping. Children we don't
+        manage are never reaped here: on meeting one, fall back to polling
+        each registered process.
+        """
+        if not hasattr(os, "waitid"):
+            return self._poll_each()
+        # Already reaped elsewhere (e.g. by cancel_all), so invisible to waitid.
+        exited = [i for i in self._by_pid.values() if i.process.returncode is not None]
+        while True:
+            try:
+                si = os.waitid(os.P_ALL, 0, os.WEXITED | os.WNOHANG | os.WNOWAIT)
+            except ChildProcessError:
+                break
+            if si is None:
+                break
+            info = self._by_pid.get(si.si_pid)
+            if info is None or info.process.poll() is None:
+                return self._poll_each()
+            exited.append(info)
+        return exited
+
+    def _poll_each(self) -> list[ProcessInfo]:
+        return [info for info in self._by_pid.values() if info.process.poll() is not None]
+
+    def _read_chunk(self, fd: int, info: ProcessInfo) -> bool:
+        """Read one chunk from a child's stdout. Returns False once it hits EOF."""
+        if fd not in self._selector.get_map():
+            return False
+        data = os.read(fd, _READ_SIZE)
+        if data:
+            info.stdout_chunks.append(data)
+            return True
+        self._selector.unregister(fd)
+        return False
+
     def cancel(self, node_id: str) -> bool:
         """Send SIGTERM to a node's process. Returns True if signal was sent."""
         info = self._processes.get(node_id)
         if info is None:
             return False
-        try:
-            os.kill(info.process.pid, signal.SIGTERM)
-            return True
-        except ProcessLookupError:
-            return False
+        return _signal(info.process, signal.SIGTERM)
+
+    def cancel_all(self, grace: float = 2.0) -> None:
+        """Cancel all running processes.
 
-    def cancel_all(self) -> None:
-        """Cancel all running processes."""
-        for node_id in list(self._processes.keys()):
-            self.cancel(node_id)
+        Sends SIGTERM to every process first, then gives them one shared grace
+        period to exit before SIGKILLing the rest, so shutdown takes at most
+        about `grace` seconds however many agents are running.
+        """
+        for info in self._by_pid.values():
+            _signal(info.process, signal.SIGTERM)
+        deadline = time.monotonic() + grace
+        for info in self._by_pid.values():
+            try:
+                info.process.wait(timeout=max(deadline - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                _signal(info.process, signal.SIGKILL)
+                info.process.wait()
 
     @property
     def active_count(self) -> int:
         return len(self._processes)
 
     @property
-    def active_node_ids(self) -> set[str]:
-        return set(self._processes.keys())
+    def active_node_ids(self) -> KeysView[str]:
+        """Live view of running node ids; use snapshot_node_ids() to keep a copy."""
+        return self._processes.keys()
+
+    def snapshot_node_ids(self) -> set[str]:
+        return set(self._processes)
+
+
+def _signal(process: subprocess.Popen, sig: int) -> bool:
+    """Signal a process and its process group. Returns True if a signal was sent.
+
+    Agents are launched with start_new_session=True, so their pid is their
+    group id and the agent's own children (e.g. its MCP server) get the
+    signal too. A process that isn't a group leader falls back to os.kill.
+    """
+    try:
+        os.killpg(process.pid, sig)
+        return True
+    except ProcessLookupError:
+        pass
+    try:
+        os.kill(process.pid, sig)
+        return True
+    except ProcessLookupError:
+        return False
@@ -0,0 +1,19 @@
+"""Tests for the cord command line."""
+
+import pytest
+from cord.cli import main
+
+
+class TestHelp:
+    @pytest.mark.parametrize("argv", [[], ["help"]])
+    def test_prints_usage(self, argv, capsys):
+        main(argv)
+        out = capsys.readouterr().out
+        assert out.startswith("usage: cord")
+        assert "run" in out
+
+    def test_dash_h_exits_zero(self, capsys):
+        with pytest.raises(SystemExit) as exc:
+            main(["-h"])
+        assert exc.value.code == 0
+        assert capsys.readouterr().out.startswith("usage: cord")
@@ -1,5 +1,7 @@
 """Tests for CordDB."""
 
+import sqlite3
+
 import pytest
 from cord.db import CordDB
 
@@ -33,11 +35,30 @@ class TestCreateNode:
         node = db.get_node(b)
         assert node["needs"] == [a]
 
+    def test_bad_dependency_rolls_back_node(self, db):
+        root = db.create_node("goal", "Root")
+        with pytest.raises(sqlite3.IntegrityError):
+            db.create_node("task", "B", parent_id=root, needs=["#99"])
+        assert [n["node_id"] for n in db.all_nodes()] == [root]
+
+    def test_get_node_without_deps(self, db):
+        root = db.create_node("goal", "Root")
+        a = db.create_node("task", "A", parent_id=root)
+        b = db.create_node("task", "B", parent_id=root, needs=[a])
+        assert "needs" not in db.get_node(b, with_deps=False)
+        children = db.get_children(root)
+        assert [c["needs"] for c in children] == [[], [a]]
+
     def test_create_with_prompt(self, db):
         nid = db.create_node("task", "Task", prompt="Do the thing")
         node = db.get_node(nid)
         assert node["prompt"] == "Do the thing"
 
+    def test_malformed_node_id_rejected(self, db):
+        db.create_node("goal", "Root")
+        with pytest.raises(ValueError):
+            db.get_node("##1")
+
     def test_auto_increment_ids(self, db):
         a = db.create_node("goal", "A")
         b = db.create_node("task", "B")
@@ -47,6 +68,38 @@ class TestCreateNode:
         assert c == "#3"
 
 
+class TestCreateNodesBulk:
+    def test_matches_create_node(self, db):
+        root = db.create_node("goal", "Root", status="active")
+        a, b = db.create_nodes_bulk([
+            {"node_type": "task", "goal": "A", "parent_id": root},
+            {"node_type": "task", "goal": "B", "parent_id": root, "needs": [], "returns": "list"},
+        ])
+        c = db.create_nodes_bulk([
+            {"node_type": "task", "goal": "C", "parent_id": a, "needs": [a, b], "prompt": "p"},
+        ])[0]
+        assert (a, b, c) == ("#2", "#3", "#4")
+        assert db.create_node("task", "D") == "#5"
+        node = db.get_node(c)
+        assert (node["parent_id"], node["needs"], node["prompt"]) == (a, [a, b], "p")
+        assert db.get_node(b)["returns"] == "list"
+        assert db.is_descendant(c, root)
+        assert [n["goal"] for n in db.find_ready_nodes()] == ["A", "B", "D"]
+        db.complete_node(a, "x")
+        db.complete_node(b, "y")
+        assert [n["goal"] for n in db.find_ready_nodes()] == ["C", "D"]
+
+    def test_rolls_back_on_error(self, db):
+        db.create_node("goal", "Root")
+        with pytest.raises(sqlite3.IntegrityError):
+            db.create_nodes_bulk([
+                {"node_type": "task", "goal": "A"},
+                {"node_type": "bogus", "goal": "B"},
+            ])
+        assert len(db.all_nodes()) == 1
+        assert db.create_nodes_bulk([{"node_type": "task", "goal": "A"}]) == ["#2"]
+
+
 class TestUpdateStatus:
     def test_update_to_active(self, db):
         nid = db.create_node("goal", "Root")
@@ -60,6 +113,29 @@ class TestUpdateStatus:
         assert node["status"] == "complete"
         assert node["result"] == "Done!"
 
+    def test_bulk_update_status(self, db):
+        a = db.create_node("task", "A", status="active")
+        b = db.create_node("task", "B", status="active")
+        c = db.create_node("task", "C", status="active")
+        db.bulk_update_status([a, c], "cancelled")
+        assert [db.get_node(n)["status"] for n in (a, b, c)] == ["cancelled", "active", "cancelled"]
+
+
+class TestCancelSubtree:
+    def test_cancels_unfinished_descendants(self, db):
+        root = db.create_node("goal", "Root", status="active")
+        a = db.create_node("task", "A", parent_id=root, status="active")
+        a1 = db.create_node("task", "A1", parent_id=a)
+        a2 = db.create_node("task", "A2", parent_id=a, status="complete")
+        a1x = db.create_node("task", "A1x", parent_id=a1, status="paused")
+        b = db.create_node("task", "B", parent_id=root)
+        assert db.cancel_subtree(a) == 3
+        statuses = {n["node_id"]: n["status"] for n in db.snapshot_ids_and_status()}
+        assert statuses == {
+            root: "active", a: "cancelled", a1: "cancelled",
+            a2: "complete", a1x: "cancelled", b: "pending",
+        }
+
 
 class TestGetTree:
     def test_tree_structure(self, db):
@@ -81,6 +157,17 @@ class TestGetTree:
         assert len(tree["children"][0]["children"]) == 1
         assert tree["children"][0]["children"][0]["goal"] == "A1"
 
+    def test_tree_includes_needs(self, db):
+        root = db.create_node("goal", "Root")
+        a = db.create_node("task", "A", parent_id=root)
+        b = db.create_node("task", "B", parent_id=root)
+        c = db.create_node("task", "C", parent_id=root, needs=[b, a])
+        tree = db.get_tree()
+        assert tree["needs"] == []
+        assert tree["children"][2]["node_id"] == c
+        assert tree["children"][2]["needs"] == [a, b]
+        assert tree["children"][2]["children"] == []
+
 
 class TestFindReady:
     def test_no_deps_ready(self, db):
@@ -123,6 +210,30 @@ class TestFindReady:
         assert len(ready) == 1
         assert ready[0]["goal"] == "C"
 
+    def test_query_plan_uses_indexes(self, db):
+        plan = [
+            r["detail"]
+            for r in db._conn.execute("EXPLAIN QUERY PLAN " + CordDB._SELECT_READY)
+        ]
+        assert not any(d.startswith("SCAN") or "TEMP B-TREE" in d for d in plan)
+        assert any("idx_nodes_ready" in d for d in plan)
+
+    def test_dep_reopened_blocks_again(self, db):
+        root = db.create_node("goal", "Root", status="active")
+        a = db.create_node("task", "A", parent_id=root)
+        db.create_node("task", "B", parent_id=root, needs=[a])
+        db.complete_node(a, "done")
+        db.update_status(a, "active")  # relaunched for synthesis
+        assert db.find_ready_nodes() == []
+        db.complete_node(a, "synthesized")
+        assert [n["goal"] for n in db.find_ready_nodes()] == ["B"]
+
+    def test_needs_already_complete(self, db):
+        root = db.create_node("goal", "Root", status="active")
+        a = db.create_node("task", "A", parent_id=root, status="complete")
+        b = db.create_node("task", "B", parent_id=root, needs=[a])
+        assert [n["node_id"] for n in db.find_ready_nodes()] == [b]
+
 
 class TestTreeComplete:
     def test_not_complete(self, db):
@@ -139,6 +250,22 @@ class TestTreeComplete:
         db.update_status(nid, "failed")
         assert db.is_tree_complete()
 
+    def test_paused_is_open(self, db):
+        root = db.create_node("goal", "Root")
+        db.complete_node(root, "done")
+        child = db.create_node("task", "A", parent_id=root)
+        db.update_status(child, "paused")
+        assert not db.is_tree_complete()
+        db.update_status(child, "cancelled")
+        assert db.is_tree_complete()
+
+    def test_query_plan_seeks_status_index(self, db):
+        plan = [
+            r["detail"]
+            for r in db._conn.execute("EXPLAIN QUERY PLAN " + CordDB._SELECT_ANY_OPEN)
+        ]
+        assert any(d.startswith("SEARCH") and "idx_nodes_ready" in d for d in plan)
+
 
 class TestGoalChain:
     def test_root_chain(self, db):
@@ -152,6 +279,35 @@ class TestGoalChain:
         chain = db.get_goal_chain(child)
         assert chain == [(root, "Root"), (child, "Child")]
 
+    def test_missing_node(self, db):
+        assert db.get_goal_chain("#99") == []
+
+
+class TestChildStatusCounts:
+    def test_counts(self, db):
+        root = db.create_node("goal", "Root")
+        db.create_node("task", "A", parent_id=root, status="complete")
+        db.create_node("task", "B", parent_id=root, status="complete")
+        db.create_node("task", "C", parent_id=root, status="failed")
+        assert db.child_status_counts(root) == {"complete": 2, "failed": 1}
+
+    def test_no_children(self, db):
+        root = db.create_node("goal", "Root")
+        assert db.child_status_counts(root) == {}
+
+
+class TestIsDescendant:
+    def test_descendants(self, db):
+        root = db.create_node("goal", "Root")
+        a = db.create_node("task", "A", parent_id=root)
+        a1 = db.create_node("task", "A1", parent_id=a)
+        b = db.create_node("task", "B", parent_id=root)
+        assert db.is_descendant(a1, root)
+        assert db.is_descendant(a1, a)
+        assert not db.is_descendant(a1, b)
+        assert not db.is_descendant(root, a)
+        assert not db.is_descendant(a, a)
+
 
 class TestGetResults:
     def test_completed_results(self, db):
@@ -168,3 +324,150 @@ class TestGetResults:
         db.complete_node(a, "result A")
         results = db.get_completed_results([a, b])
         assert results == {a: "result A"}
+
+    def test_preserves_input_order(self, db):
+        a = db.create_node("task", "A")
+        b = db.create_node("task", "B")
+        db.complete_node(a, "result A")
+        db.complete_node(b, "result B")
+        assert list(db.get_completed_results([b, a])) == [b, a]
+
+    def test_empty_result_excluded(self, db):
+        a = db.create_node("task", "A")
+        db.complete_node(a, "")
+        assert db.get_completed_results([a]) == {}
+
+
+class TestGetGoals:
+    def test_goals(self, db):
+        a = db.create_node("task", "A")
+        b = db.create_node("task", "B")
+        assert db.get_goals([b, a, "#99"]) == {a: "A", b: "B"}
+
+    def test_id_list_longer_than_variable_limit(self, db):
+        a = db.create_node("task", "A")
+        ids = [f"#{i}" for i in range(2, 40_000)] + [a]
+        assert db.get_goals(ids) == {a: "A"}
+
+
+class TestSnapshot:
+    def test_ids_and_status(self, db):
+        root = db.create_node("goal", "Root", status="active", prompt="Long prompt")
+        child = db.create_node("task", "Child", parent_id=root)
+        db.complete_node(child, "done")
+        assert db.snapshot_ids_and_status() == [
+            {"node_id": root, "status": "active", "result": None},
+            {"node_id": child, "status": "complete", "result": "done"},
+        ]
+
+
+class TestRevision:
+    def test_own_writes(self, db):
+        before = db.revision()
+        db.create_node("goal", "Root")
+        assert db.revision() != before
+        assert db.revision() == db.revision()
+
+    def test_other_connection_writes(self, tmp_path):
+        db = CordDB(tmp_path / "r.db")
+        other = CordDB(tmp_path / "r.db")
+        before = db.revision()
+        other.create_node("goal", "Root")
+        assert db.revision() != before
+
+
+class TestTransaction:
+    def test_commits_once_at_end(self, tmp_path):
+        db = CordDB(tmp_path / "t.db")
+        other = CordDB(tmp_path / "t.db")
+        with db.transaction():
+            root = db.create_node("goal", "Root", status="active")
+            a = db.create_node("task", "A", parent_id=root)
+            db.create_node("task", "B", parent_id=root, needs=[a])
+            with db.transaction():
+                db.update_status(a, "active")
+            assert other.get_root() is None
+        assert [n["node_id"] for n in other.all_nodes()] == ["#1", "#2", "#3"]
+        assert other.get_node(a)["status"] == "active"
+
+    def test_rolls_back_on_error(self, db):
+        db.create_node("goal", "Root")
+        with pytest.raises(RuntimeError):
+            with db.transaction():
+                db.create_node("task", "A", parent_id="#1")
+                db.update_status("#1", "active")
+                raise RuntimeError
+        assert db.get_children("#1") == []
+        assert db.get_node("#1")["status"] == "pending"
+        db.create_node("task", "B", parent_id="#1")
+        assert [c["goal"] for c in db.get_children("#1")] == ["B"]
+
+
+class TestMigration:
+    # Schema as it was before pending_deps_count and node_ancestors.
+    OLD_SCHEMA = """
+    CREATE TABLE nodes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        node_type TEXT NOT NULL,
+        goal TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        parent_id INTEGER REFERENCES nodes(id),
+        prompt TEXT,
+        returns TEXT DEFAULT 'text',
+        result TEXT,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE TABLE dependencies (
+        node_id INTEGER NOT NULL REFERENCES nodes(id),
+        depends_on INTEGER NOT NULL REFERENCES nodes(id),
+        PRIMARY KEY (node_id, depends_on)
+    );
+    CREATE INDEX idx_nodes_parent ON nodes(parent_id);
+    CREATE INDEX idx_nodes_status ON nodes(status);
+    INSERT INTO nodes (node_type, goal, status, parent_id, created_at, updated_at) VALUES
+        ('goal', 'Root', 'active', NULL, 0, 0),
+        ('task', 'A', 'complete', 1, 0, 0),
+        ('task', 'B', 'pending', 1, 0, 0),
+        ('task', 'C', 'pending', 1, 0, 0),
+        ('task', 'C1', 'pending', 4, 0, 0);
+    INSERT INTO dependencies VALUES (3, 2), (4, 3);
+    """
+
+    def test_backfills_derived_state(self, tmp_path):
+        db_path = tmp_path / "old.db"
+        conn = sqlite3.connect(db_path)
+        conn.executescript(self.OLD_SCHEMA)
+        conn.close()
+
+        db = CordDB(db_path)
+        assert [n["goal"] for n in db.find_ready_nodes()] == ["B", "C1"]
+        assert db.is_descendant("#5", "#1")
+        assert db.is_descendant("#5", "#4")
+        assert not db.is_descendant("#5", "#3")
+        db.complete_node("#3", "done")
+        assert [n["goal"] for n in db.find_ready_nodes()] == ["C", "C1"]
+        child = db.create_node("task", "C2", parent_id="#5")
+        assert db.is_descendant(child, "#1")
+        # Reopening the migrated database leaves it as is.
+        assert [n["goal"] for n in CordDB(db_path).find_ready_nodes()] == ["C", "C1", "C2"]
+
+
+class TestClose:
+    def test_close_checkpoints_wal(self, tmp_path):
+        db_path = tmp_path / "test.db"
+        db = CordDB(db_path)
+        db.create_node("goal", "Root")
+        db.close()
+        assert not (tmp_path / "test.db-wal").exists()
+        assert CordDB(db_path).get_node("#1")["goal"] == "Root"
+
+
+class TestPragmas:
+    def test_connection_pragmas(self, tmp_path):
+        db = CordDB(tmp_path / "p.db")
+        conn = db._conn
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 10000
@@ -0,0 +1,64 @@
+"""Tests for agent launch configuration."""
+
+import json
+import subprocess
+from pathlib import Path
+
+from cord.runtime.dispatcher import (
+    _claude_binary,
+    _mcp_config_json,
+    generate_mcp_config,
+    launch_agent,
+)
+
+
+class TestMcpConfig:
+    def test_args(self):
+        config = generate_mcp_config(Path("/p/.cord/cord.db"), "#3", Path("/p"))
+        server = config["mcpServers"]["cord"]
+        assert server["command"] == "uv"
+        assert server["args"] == [
+            "run", "--directory", "/p", "cord-mcp-server",
+            "--db-path", "/p/.cord/cord.db", "--agent-id", "#3",
+        ]
+
+    def test_only_agent_id_varies(self):
+        a = generate_mcp_config(Path("/p/cord.db"), "#1", Path("/p"))
+        b = generate_mcp_config(Path("/p/cord.db"), "#2", Path("/p"))
+        assert a["mcpServers"]["cord"]["args"][:-1] == b["mcpServers"]["cord"]["args"][:-1]
+        assert b["mcpServers"]["cord"]["args"][-1] == "#2"
+
+    def test_json_matches_full_encode(self):
+        for agent_id in ("#1", "#12", 'odd "id" \\ \u00e9'):
+            assert _mcp_config_json(Path("/p/c\u00e9.db"), agent_id, Path("/p")) == json.dumps(
+                generate_mcp_config(Path("/p/c\u00e9.db"), agent_id, Path("/p")),
+                separators=(",", ":"),
+            )
+
+
+class TestLaunchAgent:
+    def test_inline_mcp_config(self, tmp_path, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            "cord.runtime.dispatcher.subprocess.Popen",
+            lambda cmd, **kwargs: calls.append((cmd, kwargs)),
+        )
+        db_path = tmp_path / "cord.db"
+        launch_agent(db_path, "#2", "Do it", project_dir=tmp_path)
+        [(cmd, kwargs)] = calls
+        config = json.loads(cmd[cmd.index("--mcp-config") + 1])
+        assert config == generate_mcp_config(db_path, "#2", tmp_path)
+        assert kwargs["cwd"] == str(tmp_path)
+        assert kwargs["stderr"] is subprocess.DEVNULL
+        assert kwargs["start_new_session"] is True
+        assert not kwargs.get("text")
+        assert list(tmp_path.iterdir()) == []
+
+    def test_claude_binary_resolved_from_path(self, tmp_path, monkeypatch):
+        fake = tmp_path / "claude"
+        fake.write_text("#!/bin/sh\n")
+        fake.chmod(0o755)
+        monkeypatch.setenv("PATH", str(tmp_path))
+        assert _claude_binary() == str(fake)
+        monkeypatch.setenv("PATH", str(tmp_path / "missing"))
+        assert _claude_binary() == "claude"
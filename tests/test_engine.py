@@ -1,5 +1,10 @@
 """Tests for the cord engine (SQLite-backed)."""
 
+import os
+import signal
+import subprocess
+import sys
+import time
 from pathlib import Path
 
 import pytest
@@ -52,6 +57,85 @@ class TestEngineBasics:
         all_done = all(c["status"] in ("complete", "failed", "cancelled") for c in children)
         assert all_done
 
+    def test_all_children_failed_fails_parent(self, engine):
+        root = engine.db.create_node("goal", "Root", status="complete")
+        a = engine.db.create_node("task", "A", parent_id=root, status="failed")
+        engine.db.create_node("task", "B", parent_id=root, status="cancelled")
+        engine._check_synthesis(a)
+        assert engine.db.get_node(root)["status"] == "failed"
+
+    def test_synthesis_waits_for_siblings(self, engine):
+        root = engine.db.create_node("goal", "Root", status="complete")
+        a = engine.db.create_node("task", "A", parent_id=root, status="failed")
+        engine.db.create_node("task", "B", parent_id=root, status="active")
+        engine._check_synthesis(a)
+        assert engine.db.get_node(root)["status"] == "complete"
+
+    def test_print_tree_skips_when_unchanged(self, engine, monkeypatch):
+        engine.db.create_node("goal", "Root", status="active")
+        calls = []
+        real_get_tree = engine.db.get_tree
+        monkeypatch.setattr(engine.db, "get_tree", lambda: calls.append(1) or real_get_tree())
+        engine._print_tree()
+        engine._print_tree()
+        assert len(calls) == 1
+        engine.db.create_node("task", "Child", parent_id="#1")
+        engine._print_tree()
+        assert len(calls) == 2
+
+    def test_render_deep_tree(self, engine):
+        depth = 3000
+        root = node = {"node_id": "#1", "node_type": "goal", "goal": "g", "status": "active"}
+        for i in range(2, depth + 1):
+            child = {"node_id": f"#{i}", "node_type": "task", "goal": "g", "status": "pending"}
+            node["children"] = [child]
+            node = child
+        lines = []
+        engine._render_node(root, 0, lines)
+        assert len(lines) == depth
+        assert lines[-1].startswith("  " * depth)
+
+    def test_synthesis_launched_once(self, engine, monkeypatch):
+        launched = []
+        monkeypatch.setattr(
+            "cord.runtime.engine.launch_agent",
+            lambda db_path, node_id, prompt, **kw: launched.append(node_id),
+        )
+        monkeypatch.setattr(engine.process_manager, "register", lambda *a: None)
+        root = engine.db.create_node("goal", "Root", status="complete")
+        a = engine.db.create_node("task", "A", parent_id=root, status="active")
+        b = engine.db.create_node("task", "B", parent_id=root, status="active")
+        # Both children call complete() and exit before the same poll
+        engine.db.complete_node(a, "A done")
+        engine.db.complete_node(b, "B done")
+        engine._handle_completion(a, 0, "")
+        engine._handle_completion(b, 0, "")
+        assert launched == [root]
+
+    def test_resynthesis_after_child_resynthesizes(self, engine, monkeypatch):
+        launched = []
+        monkeypatch.setattr(
+            "cord.runtime.engine.launch_agent",
+            lambda db_path, node_id, prompt, **kw: launched.append(node_id),
+        )
+        monkeypatch.setattr(engine.process_manager, "register", lambda *a: None)
+        root = engine.db.create_node("goal", "Root", status="complete")
+        a = engine.db.create_node("task", "A", parent_id=root, status="active")
+        b = engine.db.create_node("task", "B", parent_id=root, status="active")
+        a1 = engine.db.create_node("task", "A1", parent_id=a, status="active")
+        # A creates A1 and completes; B completes, so Root synthesizes
+        engine.db.complete_node(a, "A planned")
+        engine._handle_completion(a, 0, "")
+        engine.db.complete_node(b, "B done")
+        engine._handle_completion(b, 0, "")
+        engine.db.complete_node(root, "partial")
+        # A1 finishes, A is relaunched and completes again with its synthesis
+        engine.db.complete_node(a1, "A1 done")
+        engine._handle_completion(a1, 0, "")
+        engine.db.complete_node(a, "A synthesized")
+        engine._handle_completion(a, 0, "")
+        assert launched == [root, a, root]
+
     def test_handle_ask(self, engine, monkeypatch):
         root = engine.db.create_node("goal", "Root", status="active")
         ask_node = engine.db.create_node(
@@ -80,6 +164,17 @@ class TestEngineBasics:
         assert result["status"] == "complete"
         assert result["result"] == "yes"
 
+    def test_handle_ask_default_must_start_line(self, engine, monkeypatch):
+        root = engine.db.create_node("goal", "Root", status="active")
+        ask_node = engine.db.create_node(
+            "ask", "Continue?",
+            parent_id=root,
+            prompt="Continue? (Default: yes is not offered)",
+        )
+        monkeypatch.setattr("builtins.input", lambda _: "")
+        engine._handle_ask(engine.db.get_node(ask_node))
+        assert engine.db.get_node(ask_node)["result"] == "(no answer)"
+
     def test_ask_nodes_not_launched_as_agents(self, engine):
         """Ask nodes should be handled by the engine, not launched as agent processes."""
         root = engine.db.create_node("goal", "Root", status="active")
@@ -89,3 +184,32 @@ class TestEngineBasics:
         agent_nodes = [n for n in ready if n["node_type"] != "ask"]
         assert len(ask_nodes) == 1
         assert len(agent_nodes) == 0
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+@pytest.mark.parametrize("signum", [signal.SIGHUP, signal.SIGTERM])
+def test_shutdown_signal_cancels_agents(tmp_path, signum):
+    pid_file = tmp_path / "agent.pid"
+    fake = tmp_path / "bin" / "claude"
+    fake.parent.mkdir()
+    fake.write_text(f"#!/bin/sh\necho $$ > {pid_file}\nexec sleep 60\n")
+    fake.chmod(0o755)
+    env = {**os.environ, "PATH": f"{fake.parent}:{os.environ['PATH']}"}
+    engine = subprocess.Popen(
+        [
+            sys.executable, "-c",
+            "from pathlib import Path; from cord.runtime.engine import Engine; "
+            f"Engine('goal', project_dir=Path({str(tmp_path)!r}), poll_interval=0.1).run()",
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    end = time.monotonic() + 10
+    while not (pid_file.exists() and pid_file.read_text().strip()):
+        assert time.monotonic() < end, "agent never started"
+        time.sleep(0.05)
+    agent = int(pid_file.read_text())
+    engine.send_signal(signum)
+    assert engine.wait(timeout=10) == 0
+    assert not Path(f"/proc/{agent}").exists()
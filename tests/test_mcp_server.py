@@ -87,6 +87,33 @@ class TestStop:
         result = json.loads(server.stop(grandchild))
         assert result["cancelled"] == grandchild
 
+    def test_stop_cancels_descendants(self, setup_server, db):
+        server, root_id = setup_server
+        child = db.create_node("task", "A", parent_id=root_id, status="active")
+        grandchild = db.create_node("task", "B", parent_id=child)
+        result = json.loads(server.stop(child))
+        assert result == {"cancelled": child, "count": 2}
+        assert db.get_node(grandchild)["status"] == "cancelled"
+
+    def test_stop_finished_node_rejected(self, setup_server, db):
+        server, root_id = setup_server
+        child = db.create_node("task", "A", parent_id=root_id)
+        db.complete_node(child, "done")
+        result = json.loads(server.stop(child))
+        assert "error" in result
+        assert "complete" in result["error"]
+        assert db.get_node(child)["status"] == "complete"
+
+    def test_stop_finished_node_cancels_open_descendants(self, setup_server, db):
+        server, root_id = setup_server
+        child = db.create_node("task", "A", parent_id=root_id)
+        grandchild = db.create_node("task", "B", parent_id=child)
+        db.complete_node(child, "created B")
+        result = json.loads(server.stop(child))
+        assert result == {"cancelled": child, "count": 1}
+        assert db.get_node(child)["status"] == "complete"
+        assert db.get_node(grandchild)["status"] == "cancelled"
+
     def test_stop_sibling_rejected(self, setup_server, db):
         server, root_id = setup_server
         parent = db.create_node("goal", "Parent", status="active")
@@ -190,3 +217,46 @@ class TestComplete:
         node = db.get_node(root_id)
         assert node["status"] == "complete"
         assert node["result"] == '["Stripe"]'
+
+
+class TestGetDb:
+    def test_reuses_instance_per_path(self, setup_server, tmp_path):
+        server, _ = setup_server
+        assert server._get_db() is server._get_db()
+        server.db_path = str(tmp_path / "other.db")
+        assert server._get_db() is not server._open_db(str(tmp_path / "test.db"))
+
+
+class TestParseArgs:
+    def test_known_flags(self):
+        import cord.mcp.server as server
+        args = server._parse_args(["--agent-id", "#3", "--db-path", "/tmp/x.db"])
+        assert args.agent_id == "#3"
+        assert args.db_path == "/tmp/x.db"
+
+    def test_unknown_flag_rejected(self):
+        import cord.mcp.server as server
+        with pytest.raises(SystemExit):
+            server._parse_args(["--agent-id", "#3", "--db_path", "/tmp/x.db"])
+
+    def test_defaults_none(self):
+        import cord.mcp.server as server
+        args = server._parse_args([])
+        assert args.agent_id is None
+        assert args.db_path is None
+
+
+class TestNodeToJson:
+    def test_deep_tree(self):
+        import cord.mcp.server as server
+        depth = 5000
+        root = node = {"node_id": "#1", "node_type": "goal", "goal": "g", "status": "active"}
+        for i in range(2, depth + 1):
+            child = {"node_id": f"#{i}", "node_type": "task", "goal": "g", "status": "pending"}
+            node["children"] = [child]
+            node = child
+        data = server._node_to_json(root)
+        for _ in range(depth - 1):
+            data = data["children"][0]
+        assert data["id"] == f"#{depth}"
+        assert "children" not in data
@@ -0,0 +1,156 @@
+"""Tests for the subprocess manager."""
+
+import subprocess
+import sys
+import time
+
+import pytest
+from cord.runtime.process_manager import ProcessManager
+
+
+def _spawn(code: str, new_session: bool = False) -> subprocess.Popen[bytes]:
+    return subprocess.Popen(
+        [sys.executable, "-c", code],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        start_new_session=new_session,
+    )
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            state = f.read().rsplit(")", 1)[1].split()[0]
+    except FileNotFoundError:
+        return False
+    return state not in ("Z", "X")
+
+
+def _wait_for_completions(pm: ProcessManager, deadline: float = 10.0) -> list:
+    end = time.monotonic() + deadline
+    while time.monotonic() < end:
+        done = pm.poll_completions()
+        if done:
+            return done
+        pm.wait(0.5)
+    pytest.fail("process did not complete")
+
+
+@pytest.fixture
+def pm():
+    return ProcessManager()
+
+
+class TestWait:
+    def test_returns_stdout(self, pm):
+        pm.register("#1", _spawn("print('hello')"))
+        [(node_id, rc, stdout)] = _wait_for_completions(pm)
+        assert (node_id, rc, stdout) == ("#1", 0, "hello\n")
+        assert pm.active_count == 0
+
+    def test_large_output_does_not_block_child(self, pm):
+        # Far more than a pipe buffer; the child would hang if nobody read it.
+        pm.register("#1", _spawn("import sys; sys.stdout.write('x' * 1_000_000)"))
+        [(_, rc, stdout)] = _wait_for_completions(pm)
+        assert rc == 0
+        assert len(stdout) == 1_000_000
+
+    def test_wakes_on_exit_before_timeout(self, pm):
+        pm.register("#1", _spawn("pass"))
+        start = time.monotonic()
+        pm.wait(5.0)
+        assert time.monotonic() - start < 4.0
+
+    def test_no_processes_sleeps(self, pm):
+        start = time.monotonic()
+        pm.wait(0.05)
+        assert time.monotonic() - start >= 0.05
+
+    def test_nonzero_exit(self, pm):
+        pm.register("#1", _spawn("import sys; print('bad'); sys.exit(3)"))
+        [(_, rc, stdout)] = _wait_for_completions(pm)
+        assert rc == 3
+        assert stdout == "bad\n"
+
+
+class TestCancelAll:
+    def test_shared_deadline_then_kill(self, pm):
+        stubborn = (
+            "import signal, sys, time\n"
+            "signal.signal(signal.SIGTERM, signal.SIG_IGN)\n"
+            "print('ready', flush=True)\n"
+            "time.sleep(60)\n"
+        )
+        procs = [_spawn(stubborn) for _ in range(3)]
+        for i, proc in enumerate(procs):
+            assert proc.stdout.readline() == b"ready\n"
+            pm.register(f"#{i}", proc)
+        start = time.monotonic()
+        pm.cancel_all(grace=0.5)
+        assert time.monotonic() - start < 1.4
+        assert all(proc.poll() is not None for proc in procs)
+
+    def test_terminates_cooperative_processes(self, pm):
+        proc = _spawn("import time; time.sleep(60)")
+        pm.register("#1", proc)
+        pm.cancel_all()
+        assert proc.returncode is not None
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+    def test_cancel_reaches_grandchildren(self, pm):
+        parent = _spawn(
+            "import subprocess, sys, time\n"
+            "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+            "print(child.pid, flush=True)\n"
+            "time.sleep(60)\n",
+            new_session=True,
+        )
+        grandchild = int(parent.stdout.readline())
+        pm.register("#1", parent)
+        pm.cancel_all()
+        end = time.monotonic() + 5
+        while _is_running(grandchild) and time.monotonic() < end:
+            time.sleep(0.05)
+        assert not _is_running(grandchild)
+
+
+class TestPollCompletions:
+    def test_only_exited_reported(self, pm):
+        pm.register("#1", _spawn("pass"))
+        pm.register("#2", _spawn("import time; time.sleep(60)"))
+        [(node_id, rc, _)] = _wait_for_completions(pm)
+        assert (node_id, rc) == ("#1", 0)
+        assert pm.active_node_ids == {"#2"}
+        snapshot = pm.snapshot_node_ids()
+        pm.cancel_all()
+        pm.poll_completions()
+        assert not pm.active_node_ids
+        assert snapshot == {"#2"}
+
+    def test_unmanaged_child_not_reaped(self, pm):
+        other = _spawn("pass")
+        other.stdout.read()
+        time.sleep(0.2)
+        pm.register("#1", _spawn("print('x')"))
+        [(node_id, rc, stdout)] = _wait_for_completions(pm)
+        assert (node_id, rc, stdout) == ("#1", 0, "x\n")
+        # The unmanaged child is still waitable by its own Popen.
+        assert other.wait(timeout=5) == 0
+
+    def test_reregistered_node_reports_only_latest(self, pm):
+        pm.register("#1", _spawn("print('old')"))
+        pm.register("#1", _spawn("import time; time.sleep(0.5); print('new')"))
+        completions = []
+        end = time.monotonic() + 10
+        while pm.active_count and time.monotonic() < end:
+            completions += pm.poll_completions()
+            pm.wait(0.1)
+        assert completions == [("#1", 0, "new\n")]
+        assert pm.poll_completions() == []
+
+    def test_reports_process_reaped_elsewhere(self, pm):
+        proc = _spawn("pass")
+        pm.register("#1", proc)
+        proc.wait()
+        [(node_id, rc, _)] = pm.poll_completions()
+        assert (node_id, rc) == ("#1", 0)
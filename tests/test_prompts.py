@@ -0,0 +1,75 @@
+"""Tests for prompt assembly."""
+
+import pytest
+from cord.db import CordDB
+from cord.prompts import build_agent_prompt, build_synthesis_prompt
+
+
+@pytest.fixture
+def db():
+    return CordDB(":memory:")
+
+
+class TestAgentPrompt:
+    def test_layout(self, db):
+        root = db.create_node("goal", "Root", status="active")
+        a = db.create_node("task", "A", parent_id=root)
+        b = db.create_node("task", "B", parent_id=root, needs=[a], prompt="Use A", returns="list")
+        db.complete_node(a, "result A")
+        prompt = build_agent_prompt(db, b)
+        assert prompt.startswith(
+            "You are node #3 in a coordination tree.\n"
+            "Your goal: B\n"
+            "\n"
+            "Goal chain:\n"
+            '  #1 "Root"\n'
+            '    #3 "B" <- your task\n'
+            "\n"
+            "Results from needed nodes:\n"
+            "\n"
+            '--- #2 "A" ---\n'
+            "result A\n"
+            "\n"
+            "Your task:\n"
+            "Use A\n"
+            "\n"
+            "You have MCP tools available for coordination:\n"
+        )
+        assert prompt.endswith(
+            "IMPORTANT: When you are done, you MUST call the `complete` tool with your result.\n"
+            "\n"
+            "Output ONLY a JSON array. No markdown formatting, no explanation."
+        )
+
+    def test_goal_with_braces(self, db):
+        nid = db.create_node("goal", "Format {this}")
+        assert "Your goal: Format {this}\n" in build_agent_prompt(db, nid)
+
+    def test_missing_node(self, db):
+        assert build_agent_prompt(db, "#99") == ""
+
+
+class TestSynthesisPrompt:
+    def test_layout(self, db):
+        root = db.create_node("goal", "Root", status="active", prompt="Merge them")
+        a = db.create_node("task", "A", parent_id=root)
+        b = db.create_node("task", "B", parent_id=root)
+        db.complete_node(a, "result A")
+        db.update_status(b, "failed")
+        assert build_synthesis_prompt(db, root) == (
+            'You are node #1: "Root"\n'
+            "\n"
+            "Your child tasks have completed. Here are their results:\n"
+            "\n"
+            '--- #2 "A" ---\n'
+            "result A\n"
+            "\n"
+            "Original instructions:\n"
+            "Merge them\n"
+            "\n"
+            "Synthesize the results from your child tasks into your final output.\n"
+            "\n"
+            "IMPORTANT: When you are done, you MUST call the `complete` tool with your result.\n"
+            "\n"
+            "Output your result as plain text."
+        )